@@ -1,18 +1,9 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import time
 
-# Create FastAPI app
-app = FastAPI(
-    title="IdeaVisor API",
-    description="AI-Powered Startup Validation Platform",
-    version="1.0.0"
-)
+# Reference point for the import-time and time-to-first-request measurements
+IMPORT_STARTED = time.perf_counter()
 
-# CORS middleware for frontend integration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
\ No newline at end of file
+from dotenv import load_dotenv
+
+# Load environment variables before any module reads its configuration
+load_dotenv()
@@ -11,3 +11,16 @@ class ReportError(Exception):
     def __init__(self, message: str):
         self.message = message
         super().__init__(self.message)
+
+class QueueFullError(Exception):
+    """Raised when the analysis queue cannot accept more work."""
+    def __init__(self, message: str, retry_after: int):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+class AIServiceUnavailableError(AIAnalysisError):
+    """Raised when the AI provider is considered down and calls fail fast."""
+    def __init__(self, message: str, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(message)
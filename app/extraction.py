@@ -0,0 +1,188 @@
+# app/extraction.py
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from multiprocessing.connection import Connection
+from typing import Any, List, Optional, Tuple
+from fastapi import UploadFile
+from .metrics import PDF_EXTRACTION_DURATION, PDF_PAGES
+
+logger = logging.getLogger(__name__)
+
+# PDF extraction limits
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_EXTRACTION_TIMEOUT = float(os.getenv("PDF_EXTRACTION_TIMEOUT", "20"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "2"))
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "256"))
+PDF_CHUNK_SIZE = 64 * 1024
+
+def _extract_pdf_text(path: str, max_pages: int) -> Tuple[str, int]:
+    """Extract text and page count from a PDF on disk. Runs in a worker process."""
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(path)
+    page_count = len(reader.pages)
+    if page_count > max_pages:
+        raise ValueError(f"PDF has {page_count} pages; the maximum is {max_pages}")
+    return "\n".join(page.extract_text() or "" for page in reader.pages).strip(), page_count
+
+def _worker_main(conn: Connection) -> None:
+    """Serve extraction jobs sent over ``conn`` until the parent closes it"""
+    import PyPDF2  # noqa: F401  (loaded before reporting ready)
+
+    conn.send(None)
+    while True:
+        try:
+            path, max_pages = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, _extract_pdf_text(path, max_pages)))
+        except Exception as e:
+            # Library exceptions do not always pickle; the parent only needs the type and message
+            conn.send((False, (isinstance(e, ValueError), str(e))))
+
+class _ExtractionWorker:
+    """One extraction process, running one job at a time"""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self._ready = False
+
+    def run(self, path: str, max_pages: int, timeout: float) -> Optional[Tuple[bool, Any]]:
+        """Run a job, returning None if it did not finish in ``timeout`` seconds; blocking"""
+        if not self._ready:
+            # A new worker's start-up is not charged to the job
+            self.conn.recv()
+            self._ready = True
+        self.conn.send((path, max_pages))
+        if not self.conn.poll(timeout):
+            return None
+        return self.conn.recv()
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.conn.close()
+
+class PDFExtractor:
+    """Extracts resume text in worker processes with size, page and time limits.
+
+    Uploads are streamed to a temp file rather than read into memory, and the
+    extracted text is cached by the SHA-256 of the file content. Each job has a
+    worker to itself, so a job that times out is stopped by killing just its worker.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = PDF_MAX_BYTES,
+        max_pages: int = PDF_MAX_PAGES,
+        timeout: float = PDF_EXTRACTION_TIMEOUT,
+        workers: int = PDF_EXTRACTION_WORKERS,
+        cache_size: int = PDF_CACHE_MAX_ENTRIES,
+    ):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.workers = workers
+        self.cache_size = cache_size
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_ExtractionWorker] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def shutdown(self) -> None:
+        """Stop the idle worker processes"""
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+    async def _run_job(self, tmp_path: str) -> Optional[Tuple[bool, Any]]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            while self._idle and not self._idle[-1].process.is_alive():
+                self._idle.pop().kill()
+            worker = self._idle.pop() if self._idle else _ExtractionWorker(self._context)
+            try:
+                # The timeout starts once a worker has the job, not while it waits for one
+                result = await asyncio.to_thread(worker.run, tmp_path, self.max_pages, self.timeout)
+            except BaseException:
+                # Cancelled mid-job: the worker may still be busy, so it is not reused
+                worker.kill()
+                raise
+            if result is None:
+                # A timed-out extraction cannot be cancelled; replace only this worker
+                worker.kill()
+            else:
+                self._idle.append(worker)
+            return result
+
+    async def extract(self, file: UploadFile) -> str:
+        if not file.filename or not file.filename.lower().endswith('.pdf'):
+            raise ValueError('Only PDF files are supported')
+
+        tmp_path, digest = await self._spool(file)
+        try:
+            cached = self._cache.get(digest)
+            if cached is not None:
+                self._cache.move_to_end(digest)
+                return cached
+
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await self._run_job(tmp_path)
+                if result is None:
+                    outcome = "timeout"
+                    raise ValueError(f'Error reading PDF file: extraction took longer than {self.timeout:g} seconds')
+                ok, value = result
+                if not ok:
+                    limit_exceeded, message = value
+                    raise ValueError(message if limit_exceeded else f'Error reading PDF file: {message}')
+                text, page_count = value
+                outcome = "ok"
+            except ValueError:
+                raise
+            except Exception as e:
+                raise ValueError(f'Error reading PDF file: {str(e)}')
+            finally:
+                PDF_EXTRACTION_DURATION.observe(time.perf_counter() - started, outcome=outcome)
+            PDF_PAGES.observe(page_count)
+        finally:
+            os.unlink(tmp_path)
+
+        self._cache[digest] = text
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    async def _spool(self, file: UploadFile):
+        """Copy the upload to a temp file in chunks, hashing it and enforcing the size limit"""
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := await file.read(PDF_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f'PDF file exceeds the maximum size of {self.max_bytes} bytes')
+                    hasher.update(chunk)
+                    await asyncio.to_thread(out.write, chunk)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path, hasher.hexdigest()
+
+# Shared extractor, shut down by the application lifespan
+pdf_extractor = PDFExtractor()
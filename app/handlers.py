@@ -3,7 +3,8 @@
 import logging
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from .exceptions import AIAnalysisError, ReportError
+from .metrics import HTTP_ERRORS
+from .exceptions import AIAnalysisError, AIServiceUnavailableError, ReportError, QueueFullError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +13,7 @@ logger = logging.getLogger(__name__)
 async def ai_analysis_exception_handler(request: Request, exc: AIAnalysisError):
     """Handles exceptions raised from the AI service."""
     logger.error(f"AIAnalysisError on path {request.url.path}: {exc.message}")
+    HTTP_ERRORS.inc(code="ai_analysis_failed")
     return JSONResponse(
         status_code=500,
         content={
@@ -23,9 +25,26 @@ async def ai_analysis_exception_handler(request: Request, exc: AIAnalysisError):
         },
     )
 
+async def ai_service_unavailable_exception_handler(request: Request, exc: AIServiceUnavailableError):
+    """Handles fast failures while the AI provider circuit is open."""
+    logger.warning(f"AIServiceUnavailableError on path {request.url.path}: {exc.message}")
+    HTTP_ERRORS.inc(code="ai_service_unavailable")
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "ok": False,
+            "error": {
+                "code": "ai_service_unavailable",
+                "message": exc.message
+            }
+        },
+    )
+
 async def report_exception_handler(request: Request, exc: ReportError):
     """Handles exceptions raised during report operations."""
     logger.error(f"ReportError on path {request.url.path}: {exc.message}")
+    HTTP_ERRORS.inc(code="report_operation_failed")
     return JSONResponse(
         status_code=500,
         content={
@@ -37,9 +56,26 @@ async def report_exception_handler(request: Request, exc: ReportError):
         },
     )
 
+async def queue_full_exception_handler(request: Request, exc: QueueFullError):
+    """Handles backpressure when the analysis queue is full."""
+    logger.warning(f"QueueFullError on path {request.url.path}: {exc.message}")
+    HTTP_ERRORS.inc(code="analysis_queue_full")
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "ok": False,
+            "error": {
+                "code": "analysis_queue_full",
+                "message": exc.message
+            }
+        },
+    )
+
 async def generic_exception_handler(request: Request, exc: Exception):
     """Handles any other unexpected exceptions."""
     logger.critical(f"An unhandled exception occurred on path {request.url.path}: {exc}", exc_info=True)
+    HTTP_ERRORS.inc(code="internal_server_error")
     return JSONResponse(
         status_code=500,
         content={
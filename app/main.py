@@ -1,35 +1,99 @@
-__all__ = ["app"]
+__all__ = ["app", "create_app"]
 
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from . import IMPORT_STARTED
 from .routes.router import router
-from .exceptions import AIAnalysisError, ReportError
+from .routes.metrics import router as metrics_router
+from .compression import CompressionMiddleware
+from .responses import FastJSONResponse
+from .metrics import APP_IMPORT_SECONDS, APP_STARTUP_SECONDS, MetricsMiddleware
+from .services.service import open_client, close_client
+from .services.scheduler import scheduler
+from .services.jobqueue import close_job_queue
+from .reports import close_store, get_store
+from .reports.compaction import report_compactor
+from .reports.similarity import similarity_index
+from .reports.summary import summary_index
+from .extraction import pdf_extractor
+from .exceptions import AIAnalysisError, AIServiceUnavailableError, ReportError, QueueFullError
 from .handlers import (
     ai_analysis_exception_handler,
+    ai_service_unavailable_exception_handler,
     report_exception_handler,
+    queue_full_exception_handler,
     generic_exception_handler,
 )
 
-# Create FastAPI app
-app = FastAPI(
-    title="IdeaVisor API",
-    description="AI-Powered Startup Validation Platform",
-    version="1.0.0"
-)
+logger = logging.getLogger(__name__)
 
-# Register exception handlers
-app.add_exception_handler(AIAnalysisError, ai_analysis_exception_handler)
-app.add_exception_handler(ReportError, report_exception_handler)
-app.add_exception_handler(Exception, generic_exception_handler)
-
-# CORS middleware for frontend integration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources once per worker on startup and release them on shutdown"""
+    started = time.perf_counter()
+    open_client()
+    await asyncio.to_thread(get_store)
+    await scheduler.start()
+    await report_compactor.start()
+    await similarity_index.start()
+    await summary_index.start()
+    elapsed = time.perf_counter() - started
+    APP_STARTUP_SECONDS.set(elapsed)
+    logger.info(f"Application startup took {elapsed:.3f}s")
+    try:
+        yield
+    finally:
+        await summary_index.stop()
+        await similarity_index.stop()
+        await report_compactor.stop()
+        await scheduler.stop()
+        await close_client()
+        close_job_queue()
+        close_store()
+        pdf_extractor.shutdown()
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application. Resources are opened by the lifespan, not here."""
+    app = FastAPI(
+        title="IdeaVisor API",
+        description="AI-Powered Startup Validation Platform",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse
+    )
+
+    # Register exception handlers
+    app.add_exception_handler(AIAnalysisError, ai_analysis_exception_handler)
+    app.add_exception_handler(AIServiceUnavailableError, ai_service_unavailable_exception_handler)
+    app.add_exception_handler(ReportError, report_exception_handler)
+    app.add_exception_handler(QueueFullError, queue_full_exception_handler)
+    app.add_exception_handler(Exception, generic_exception_handler)
+
+    # CORS middleware for frontend integration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Configure for production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Negotiated brotli/gzip for larger responses
+    app.add_middleware(CompressionMiddleware)
+
+    # Request latency and in-flight metrics; added last so it wraps every other middleware
+    app.add_middleware(MetricsMiddleware, started=IMPORT_STARTED)
+
+    # Include routers
+    app.include_router(router, prefix="/api/v1")
+    app.include_router(metrics_router)
+    return app
+
+APP_IMPORT_SECONDS.set(time.perf_counter() - IMPORT_STARTED)
 
-# Include router
-app.include_router(router, prefix="/api/v1")
+# Module-level instance for `uvicorn app.main:app`; `uvicorn app.main:create_app --factory` also works
+app = create_app()
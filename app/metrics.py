@@ -0,0 +1,234 @@
+# app/metrics.py
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Minimal Prometheus-compatible metrics. Updates are plain dict/int operations on
+# the event loop, cheap enough to leave enabled in production.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Exposition lines for the current values"""
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in self._values.items()]
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), function: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function = function
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the (unlabelled) value at scrape time"""
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in self._values.items()]
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# Startup
+APP_IMPORT_SECONDS = Gauge("app_import_seconds", "Time taken to import the application.")
+APP_STARTUP_SECONDS = Gauge("app_startup_seconds", "Time spent opening shared resources in the lifespan hook.")
+APP_FIRST_REQUEST_SECONDS = Gauge("app_first_request_seconds", "Time from the start of the import to the first response.")
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+HTTP_ERRORS = Counter("http_errors_total", "Error responses by handler error code.", ("code",))
+
+# Model calls
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds", "Latency of AI provider calls.", ("model", "outcome"),
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180),
+)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported in completion usage.", ("model", "type"))
+
+# Analysis jobs
+ANALYSES_QUEUED = Gauge("analysis_jobs_queued", "Analysis jobs waiting for a worker slot.")
+ANALYSES_IN_FLIGHT = Gauge("analysis_jobs_in_flight", "Analysis jobs currently running.")
+ANALYSES_TOTAL = Counter("analyses_total", "Finished analyses by outcome and how they were run.", ("outcome", "mode"))
+ANALYSIS_CACHE_LOOKUPS = Counter("analysis_cache_lookups_total", "Analysis cache lookups.", ("result",))
+SCREENING_DECISIONS = Counter("analysis_screening_total", "Submissions checked by local screening.", ("result",))
+SCREENING_REJECTIONS = Counter(
+    "analysis_screening_rejections_total", "Submissions answered by local screening without a model call, by reason.", ("reason",),
+)
+ANALYSIS_REUSE_LOOKUPS = Counter("analysis_reuse_lookups_total", "Lookups of a similar prior analysis to reuse.", ("result",))
+
+# PDF extraction
+PDF_EXTRACTION_DURATION = Histogram(
+    "pdf_extraction_duration_seconds", "Time spent extracting text from resume PDFs.", ("outcome",),
+)
+PDF_PAGES = Histogram("pdf_pages", "Page count of extracted resume PDFs.", buckets=(1, 2, 3, 5, 10, 20, 50, 100))
+
+# Report storage
+REPORT_STORE_DURATION = Histogram(
+    "report_store_duration_seconds", "Report store I/O latency.", ("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+REPORT_CACHE_LOOKUPS = Counter("report_cache_lookups_total", "Report hot cache lookups.", ("result",))
+REPORT_WAITERS = Gauge("report_waiters", "Long-poll and WebSocket clients waiting for a report update.")
+SIMILARITY_INDEX_SIZE = Gauge("similarity_index_reports", "Completed reports in the similarity index.")
+SIMILARITY_SEARCH_DURATION = Histogram(
+    "similarity_search_duration_seconds", "Similarity index search latency.",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests.
+
+    ``started`` is the ``time.perf_counter()`` reference for the time-to-first-request gauge.
+    """
+
+    def __init__(self, app, started: Optional[float] = None):
+        self.app = app
+        self.started = started
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status),
+            )
+            if self.started is not None:
+                elapsed = time.perf_counter() - self.started
+                self.started = None
+                APP_FIRST_REQUEST_SECONDS.set(elapsed)
+                logger.info(f"First request served {elapsed:.3f}s after import started")
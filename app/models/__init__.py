@@ -1,3 +1,17 @@
-from .models import StartupIdea, ValidationReport
+from .models import (
+    StartupIdea,
+    ValidationReport,
+    AnalysisData,
+    AnalysisResponse,
+    ClarificationResponse,
+    AI_RESPONSE_ADAPTER,
+)
 
-__all__ = ['StartupIdea', 'ValidationReport']
\ No newline at end of file
+__all__ = [
+    'StartupIdea',
+    'ValidationReport',
+    'AnalysisData',
+    'AnalysisResponse',
+    'ClarificationResponse',
+    'AI_RESPONSE_ADAPTER',
+]
\ No newline at end of file
@@ -1,9 +1,9 @@
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, BeforeValidator, Field, TypeAdapter, model_validator
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Annotated, Any, List, Literal, Optional, Union
+import re
 from fastapi import Form, UploadFile
-import PyPDF2
-from io import BytesIO
+from ..extraction import pdf_extractor
 
 class StartupIdea(BaseModel):
     idea: str = Field(..., min_length=10, max_length=1000)
@@ -11,24 +11,11 @@ class StartupIdea(BaseModel):
     problem: str = Field(..., min_length=10, max_length=1000)
     solution: str = Field(..., min_length=10, max_length=1000)
     background: str = Field(..., min_length=10)
-    resume_file: Optional[UploadFile] = None
+    resume_file: Optional[UploadFile] = Field(None, exclude=True)
     
     @classmethod
     async def extract_text_from_pdf(cls, file: UploadFile) -> str:
-        if not file.filename.lower().endswith('.pdf'):
-            raise ValueError('Only PDF files are supported')
-            
-        content = await file.read()
-        pdf_file = BytesIO(content)
-        
-        try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ''
-            for page in pdf_reader.pages:
-                text += page.extract_text() + '\n'
-            return text.strip()
-        except Exception as e:
-            raise ValueError(f'Error reading PDF file: {str(e)}')
+        return await pdf_extractor.extract(file)
 
     @classmethod
     async def as_form(
@@ -67,6 +54,202 @@ class StartupIdea(BaseModel):
                 
         return self
 
+# Coercion helpers for AI-generated analysis values. Values that cannot be coerced
+# fall back to the field default instead of failing the whole report.
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+def _score(default: float):
+    def coerce(value: Any) -> float:
+        if isinstance(value, bool):
+            return default
+        if isinstance(value, (int, float)):
+            number = float(value)
+        elif isinstance(value, str):
+            # Accept "7", "7.5", "7/10", "7.5 out of 10", "70%"
+            match = _NUMBER.search(value)
+            if not match:
+                return default
+            number = float(match.group())
+            if "%" in value:
+                number /= 10
+        else:
+            return default
+        return min(10.0, max(0.0, number))
+    return Annotated[float, BeforeValidator(coerce), Field(default=default)]
+
+def _text(default: str):
+    def coerce(value: Any) -> str:
+        if value is None:
+            return default
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (list, tuple)):
+            return "; ".join(str(item) for item in value)
+        return str(value)
+    return Annotated[str, BeforeValidator(coerce), Field(default=default)]
+
+def _text_list(default: List[str]):
+    def coerce(value: Any) -> List[str]:
+        if value is None:
+            return list(default)
+        if isinstance(value, str):
+            return [value]
+        if isinstance(value, (list, tuple)):
+            return [item if isinstance(item, str) else str(item) for item in value if item is not None]
+        return list(default)
+    return Annotated[List[str], BeforeValidator(coerce), Field(default_factory=lambda: list(default))]
+
+class AnalysisSection(BaseModel):
+    """Base for report sections: a section of the wrong shape is replaced by its defaults"""
+
+    @model_validator(mode="before")
+    @classmethod
+    def _require_object(cls, value: Any) -> Any:
+        return value if isinstance(value, dict) else {}
+
+def _object_list(model, default: List[dict]):
+    def coerce(value: Any) -> List[Any]:
+        if isinstance(value, dict):
+            value = [value]
+        if not isinstance(value, (list, tuple)):
+            return [dict(item) for item in default]
+        return [item for item in value if isinstance(item, dict)] or [dict(item) for item in default]
+    return Annotated[List[model], BeforeValidator(coerce), Field(default_factory=lambda: [model(**item) for item in default])]
+
+class MarketAnalysis(AnalysisSection):
+    tam: _text("Market data not available")
+    sam: _text("Market data not available")
+    som: _text("Market data not available")
+    growth_rate: _text("Unknown")
+    key_trends: _text_list(["Market trend analysis needed"])
+
+class Competitor(AnalysisSection):
+    name: _text("Unknown")
+    market_share: _text("Unknown")
+    weakness: _text("Requires analysis")
+
+class CompetitiveLandscape(AnalysisSection):
+    direct_competitors: _object_list(Competitor, [{"name": "Unknown", "market_share": "Unknown", "weakness": "Requires analysis"}])
+    competitive_advantage: _text("Needs identification")
+    market_gap: _text("Requires market research")
+
+class RiskAssessment(AnalysisSection):
+    high_risks: _text_list(["Market validation needed"])
+    medium_risks: _text_list(["Competition analysis needed"])
+    low_risks: _text_list(["Technical implementation"])
+
+class FounderMarketFit(AnalysisSection):
+    score: _score(7.0)
+    strengths: _text_list(["Relevant background"])
+    gaps: _text_list(["Industry-specific experience"])
+    recommendations: _text_list(["Gain market expertise"])
+
+YC_SCORE_FIELDS = ("problem_clarity", "solution_fit", "market_size", "founder_strength", "traction_potential")
+
+class YCCriteriaAssessment(AnalysisSection):
+    problem_clarity: _score(7)
+    solution_fit: _score(7)
+    market_size: _score(7)
+    founder_strength: _score(7)
+    traction_potential: _score(7)
+    overall_score: _score(7.0)
+    notes: _text("Requires deeper validation")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _drop_null_overall_score(cls, value: Any) -> Any:
+        if isinstance(value, dict) and "overall_score" in value and value["overall_score"] is None:
+            value = {k: v for k, v in value.items() if k != "overall_score"}
+        return value
+
+    @model_validator(mode="after")
+    def _average_overall_score(self) -> 'YCCriteriaAssessment':
+        # overall_score is defined as the average of the criteria; derive it when missing
+        if "overall_score" not in self.model_fields_set:
+            self.overall_score = round(sum(getattr(self, name) for name in YC_SCORE_FIELDS) / len(YC_SCORE_FIELDS), 1)
+        return self
+
+class Recommendations(AnalysisSection):
+    mvp_strategy: _text("Build and test minimum viable product")
+    funding_needs: _text("Determine based on market research")
+    key_partnerships: _text_list(["Industry partnerships needed"])
+    success_metrics: _text_list(["User acquisition", "Revenue growth"])
+
+class FundingRequirement(AnalysisSection):
+    stage: _text("Seed")
+    amount: _text("$500k-1M")
+    use: _text("MVP Development & Market Entry")
+
+class FinancialProjections(AnalysisSection):
+    revenue_model: _text("To be determined")
+    avg_booking_value: _text("Unknown")
+    monthly_bookings_y1: _text("To be projected")
+    projected_mrr_y1: _text("Unknown")
+    customer_acquisition_cost: _text("To be calculated")
+    customer_lifetime_value: _text("To be calculated")
+    break_even_timeline: _text("12-18 months")
+    funding_requirements: _object_list(FundingRequirement, [{"stage": "Seed", "amount": "$500k-1M", "use": "MVP Development & Market Entry"}])
+
+class ActionPhase(AnalysisSection):
+    timeline: _text("")
+    title: _text("")
+    tasks: _text_list([])
+
+ACTION_PLAN_DEFAULTS = {
+    "phase_1": {"timeline": "0-3 months", "title": "Validation & Planning", "tasks": ["Market Research", "MVP Planning"]},
+    "phase_2": {"timeline": "3-6 months", "title": "Development & Testing", "tasks": ["MVP Development", "Beta Testing"]},
+    "phase_3": {"timeline": "6-12 months", "title": "Launch & Growth", "tasks": ["Market Launch", "Customer Acquisition"]},
+}
+
+class ActionPlan(AnalysisSection):
+    phase_1: ActionPhase = Field(default_factory=lambda: ActionPhase(**ACTION_PLAN_DEFAULTS["phase_1"]))
+    phase_2: ActionPhase = Field(default_factory=lambda: ActionPhase(**ACTION_PLAN_DEFAULTS["phase_2"]))
+    phase_3: ActionPhase = Field(default_factory=lambda: ActionPhase(**ACTION_PLAN_DEFAULTS["phase_3"]))
+
+    @model_validator(mode="before")
+    @classmethod
+    def _fill_phase_defaults(cls, value: Any) -> Any:
+        # Partially filled phases inherit the phase-specific defaults
+        if not isinstance(value, dict):
+            return {}
+        return {
+            **value,
+            **{
+                name: {**defaults, **{k: v for k, v in value[name].items() if v not in (None, "", [])}}
+                for name, defaults in ACTION_PLAN_DEFAULTS.items()
+                if isinstance(value.get(name), dict)
+            },
+        }
+
+class AnalysisData(AnalysisSection):
+    """The complete, structurally valid analysis produced by the AI"""
+    viability_score: _score(0)
+    market_size: _text("Unknown")
+    competition_level: _text("Medium")
+    time_to_market: _text("6-12 months")
+    market_analysis: MarketAnalysis = Field(default_factory=MarketAnalysis)
+    competitive_landscape: CompetitiveLandscape = Field(default_factory=CompetitiveLandscape)
+    risk_assessment: RiskAssessment = Field(default_factory=RiskAssessment)
+    founder_market_fit: FounderMarketFit = Field(default_factory=FounderMarketFit)
+    yc_criteria_assessment: YCCriteriaAssessment = Field(default_factory=YCCriteriaAssessment)
+    recommendations: Recommendations = Field(default_factory=Recommendations)
+    financial_projections: FinancialProjections = Field(default_factory=FinancialProjections)
+    action_plan: ActionPlan = Field(default_factory=ActionPlan)
+
+class AnalysisResponse(BaseModel):
+    type: Literal["analysis"]
+    data: AnalysisData
+
+class ClarificationResponse(BaseModel):
+    type: Literal["clarification_request"]
+    message: str = "The AI requires more information to proceed."
+
+# Compiled once at import: parses raw model output with the Rust JSON parser and validates it in one pass
+AI_RESPONSE_ADAPTER = TypeAdapter(
+    Annotated[Union[AnalysisResponse, ClarificationResponse], Field(discriminator="type")]
+)
+
 class ValidationReport(BaseModel):
     id: str
     startup_data: StartupIdea
@@ -74,12 +257,12 @@ class ValidationReport(BaseModel):
     market_size: str
     competition_level: str
     time_to_market: str
-    market_analysis: Dict
-    risk_assessment: Dict
-    recommendations: Dict
-    financial_projections: Dict
-    action_plan: Dict
-    competitive_landscape: Dict
-    founder_market_fit: Dict
-    yc_criteria_assessment: Dict
+    market_analysis: MarketAnalysis
+    risk_assessment: RiskAssessment
+    recommendations: Recommendations
+    financial_projections: FinancialProjections
+    action_plan: ActionPlan
+    competitive_landscape: CompetitiveLandscape
+    founder_market_fit: FounderMarketFit
+    yc_criteria_assessment: YCCriteriaAssessment
     created_at: datetime
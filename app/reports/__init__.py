@@ -1,32 +1,96 @@
-import json
+import asyncio
+import logging
 import os
 from pathlib import Path
+from typing import Callable, List, Optional
+from ..exceptions import ReportError
+from ..metrics import REPORT_CACHE_LOOKUPS, REPORT_STORE_DURATION
+from .base import ReportStore, decode_report, encode_report
+from .cache import CachedReport, report_cache
+from .filesystem import FileSystemReportStore
+from .sqlite import SQLiteReportStore
 
-# Create reports directory if it doesn't exist
-REPORTS_DIR = Path(__file__).parent / 'data'
-REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+logger = logging.getLogger(__name__)
 
-def save_report(report_id: str, report_data: dict) -> None:
-    """Save report data to a JSON file"""
+# Storage configuration
+REPORTS_DIR = Path(os.getenv("REPORTS_DIR", Path(__file__).parent / 'data'))
+REPORT_STORE_BACKEND = os.getenv("REPORT_STORE_BACKEND", "filesystem")
+REPORT_STORE_SQLITE_PATH = Path(os.getenv("REPORT_STORE_SQLITE_PATH", REPORTS_DIR / 'reports.db'))
+
+# Filesystem store: statuses stored gzip-compressed, and the gzip level
+REPORT_COMPRESS_STATUSES = [s.strip() for s in os.getenv("REPORT_COMPRESS_STATUSES", "completed").split(",") if s.strip()]
+REPORT_COMPRESS_LEVEL = int(os.getenv("REPORT_COMPRESS_LEVEL", "6"))
+
+_store: Optional[ReportStore] = None
+
+# Called with (report_id, report_data) after every successful save, on the event loop
+SaveListener = Callable[[str, dict], None]
+_save_listeners: List[SaveListener] = []
+
+def add_save_listener(listener: SaveListener) -> None:
+    """Register a callback run after each report save; it must be fast and not block"""
+    _save_listeners.append(listener)
+
+def create_store(backend: str = REPORT_STORE_BACKEND) -> ReportStore:
+    """Create the configured report store backend"""
+    if backend == "filesystem":
+        return FileSystemReportStore(REPORTS_DIR, REPORT_COMPRESS_STATUSES, REPORT_COMPRESS_LEVEL)
+    if backend == "sqlite":
+        return SQLiteReportStore(REPORT_STORE_SQLITE_PATH)
+    raise ValueError(f"Unknown REPORT_STORE_BACKEND '{backend}'")
+
+def get_store() -> ReportStore:
+    """Return the shared report store, creating it on first use"""
+    global _store
+    if _store is None:
+        _store = create_store()
+    return _store
+
+def close_store() -> None:
+    """Close the shared report store"""
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
+
+async def save_report(report_id: str, report_data: dict) -> None:
+    """Save report data without blocking the event loop and refresh the hot cache"""
+    status = report_data.get("status")
+    report_cache.invalidate(report_id)
     try:
-        # Ensure data directory exists
-        REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-        report_path = REPORTS_DIR / f"{report_id}.json"
-        with open(report_path, 'w') as f:
-            json.dump(report_data, f, default=str)
+        body = encode_report(report_data)
+        with REPORT_STORE_DURATION.time(operation="write"):
+            await asyncio.to_thread(get_store().write, report_id, status, body)
     except Exception as e:
-        print(f"Error saving report {report_id}: {str(e)}")
-        raise
+        logger.error(f"Error saving report {report_id}: {str(e)}")
+        raise ReportError(f"Failed to save report {report_id}: {str(e)}") from e
+    report_cache.put(report_id, body, status)
+    for listener in _save_listeners:
+        try:
+            listener(report_id, report_data)
+        except Exception as e:
+            logger.error(f"Save listener failed for report {report_id}: {str(e)}")
 
-def get_report(report_id: str) -> dict:
-    """Retrieve report data from JSON file"""
+async def get_report_entry(report_id: str) -> Optional[CachedReport]:
+    """Retrieve the encoded report and its ETag, serving recent reports from memory"""
+    entry = report_cache.get(report_id)
+    if entry is not None:
+        REPORT_CACHE_LOOKUPS.inc(result="hit")
+        return entry
+    REPORT_CACHE_LOOKUPS.inc(result="miss")
     try:
-        report_path = REPORTS_DIR / f"{report_id}.json"
-        if not report_path.exists():
-            return None
-            
-        with open(report_path, 'r') as f:
-            return json.load(f)
+        with REPORT_STORE_DURATION.time(operation="read"):
+            body = await asyncio.to_thread(get_store().read, report_id)
     except Exception as e:
-        print(f"Error reading report {report_id}: {str(e)}")
-        return None
\ No newline at end of file
+        logger.error(f"Error reading report {report_id}: {str(e)}")
+        raise ReportError(f"Failed to retrieve report {report_id}: {str(e)}") from e
+    if body is None:
+        return None
+    return report_cache.put(report_id, body, decode_report(body).get("status"))
+
+async def get_report(report_id: str) -> Optional[dict]:
+    """Retrieve report data, or None if the report does not exist"""
+    entry = await get_report_entry(report_id)
+    return decode_report(entry.body) if entry is not None else None
+
+__all__ = ['ReportStore', 'FileSystemReportStore', 'SQLiteReportStore', 'save_report', 'get_report', 'get_report_entry', 'get_store', 'close_store', 'add_save_listener']
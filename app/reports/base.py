@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from pydantic_core import from_json, to_json
+
+def encode_report(report_data: dict) -> bytes:
+    """Serialize a report document (which may contain Pydantic models) to JSON bytes"""
+    return to_json(report_data, fallback=str)
+
+def decode_report(body: bytes) -> dict:
+    return from_json(body)
+
+class ReportStore(ABC):
+    """Storage backend for report documents.
+
+    Methods are synchronous and may block; callers run them off the event loop.
+    Backends store the encoded JSON bytes so reads can be served without re-encoding.
+    """
+
+    @abstractmethod
+    def write(self, report_id: str, status: Optional[str], body: bytes) -> None:
+        """Create or replace the encoded report document"""
+
+    @abstractmethod
+    def read(self, report_id: str) -> Optional[bytes]:
+        """Return the encoded report document, or None if it does not exist"""
+
+    def save(self, report_id: str, report_data: dict) -> None:
+        self.write(report_id, report_data.get("status"), encode_report(report_data))
+
+    def get(self, report_id: str) -> Optional[dict]:
+        body = self.read(report_id)
+        return decode_report(body) if body is not None else None
+
+    def compact(self, ttls: Dict[str, float], dry_run: bool = False) -> dict:
+        """Delete reports older than the TTL (seconds since last update) of their status.
+
+        Returns counts of the work done, plus ``expired_ids``. With ``dry_run`` nothing is
+        changed and the counts describe what would be done.
+        """
+        return {"scanned": 0, "expired": 0, "expired_ids": []}
+
+    def iter_reports(self, statuses: Optional[Iterable[str]] = None, updated_since: Optional[float] = None) -> Iterator[Tuple[str, bytes]]:
+        """Yield (report_id, encoded document) for every stored report.
+
+        ``statuses`` limits the scan to reports in those statuses and ``updated_since``
+        (a Unix timestamp) to reports saved after it. Reports saved during the scan may or
+        may not be included.
+        """
+        return iter(())
+
+    def close(self) -> None:
+        """Release any resources held by the backend"""
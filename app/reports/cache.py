@@ -0,0 +1,66 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Hot cache configuration
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "2048"))
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "300"))
+REPORT_CACHE_ACTIVE_TTL = float(os.getenv("REPORT_CACHE_ACTIVE_TTL", "2"))
+
+# Statuses that no longer change once written
+TERMINAL_STATUSES = ("completed", "failed", "clarification_needed")
+
+class CachedReport:
+    """An encoded report document with its version tag"""
+
+    __slots__ = ("body", "etag", "status", "expires_at", "projections")
+
+    def __init__(self, body: bytes, status: Optional[str], ttl: float):
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        self.status = status
+        self.expires_at = time.monotonic() + ttl
+        # Field projections of this body, keyed by the selected paths
+        self.projections: Dict[Tuple[str, ...], "CachedReport"] = {}
+
+class ReportCache:
+    """Bounded LRU of recently saved or read reports.
+
+    Terminal reports are kept for REPORT_CACHE_TTL. Reports that are still queued or
+    processing expire after REPORT_CACHE_ACTIVE_TTL so that writes made by other
+    processes become visible quickly.
+    """
+
+    def __init__(self, max_entries: int = REPORT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedReport]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, report_id: str) -> Optional[CachedReport]:
+        entry = self._entries.get(report_id)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[report_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(report_id)
+        self.hits += 1
+        return entry
+
+    def put(self, report_id: str, body: bytes, status: Optional[str]) -> CachedReport:
+        ttl = REPORT_CACHE_TTL if status in TERMINAL_STATUSES else REPORT_CACHE_ACTIVE_TTL
+        entry = CachedReport(body, status, ttl)
+        self._entries[report_id] = entry
+        self._entries.move_to_end(report_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, report_id: str) -> None:
+        self._entries.pop(report_id, None)
+
+# Shared hot cache of report documents
+report_cache = ReportCache()
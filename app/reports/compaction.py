@@ -0,0 +1,90 @@
+"""Background expiry and compaction of stored reports.
+
+Run a single pass by hand with ``python -m app.reports.compaction [--dry-run]``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, Optional
+from . import get_store
+from .cache import report_cache
+from .similarity import similarity_index
+from .summary import summary_index
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last update after which a report of each status is deleted, as
+# "status=seconds,...". Statuses without a TTL (completed by default) are kept forever.
+DEFAULT_REPORT_TTLS = {
+    "queued": 6 * 3600,
+    "processing": 6 * 3600,
+    "failed": 24 * 3600,
+    "clarification_needed": 24 * 3600,
+}
+REPORT_TTLS: Dict[str, float] = {
+    **DEFAULT_REPORT_TTLS,
+    **{
+        name.strip(): float(value)
+        for name, _, value in (item.partition("=") for item in os.getenv("REPORT_TTLS", "").split(",") if "=" in item)
+    },
+}
+REPORT_COMPACTION_INTERVAL = float(os.getenv("REPORT_COMPACTION_INTERVAL", "3600"))
+REPORT_COMPACTION_DRY_RUN = os.getenv("REPORT_COMPACTION_DRY_RUN", "false").lower() in ("1", "true", "yes")
+
+class ReportCompactor:
+    """Periodically expires reports past their status TTL and compacts the store"""
+
+    def __init__(self, ttls: Dict[str, float] = REPORT_TTLS, interval: float = REPORT_COMPACTION_INTERVAL, dry_run: bool = REPORT_COMPACTION_DRY_RUN):
+        self.ttls = ttls
+        self.interval = interval
+        self.dry_run = dry_run
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="report-compactor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_once(self) -> dict:
+        """Run one compaction pass off the event loop and return its stats"""
+        stats = await asyncio.to_thread(get_store().compact, self.ttls, self.dry_run)
+        expired_ids = stats.pop("expired_ids", [])
+        if not self.dry_run:
+            for report_id in expired_ids:
+                report_cache.invalidate(report_id)
+                similarity_index.remove(report_id)
+                summary_index.remove(report_id)
+            # Reports expired by compaction in other processes are dropped by the same TTLs
+            summary_index.expire(self.ttls)
+        logger.info(f"Report compaction{' (dry run)' if self.dry_run else ''}: {stats}")
+        return stats
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Report compaction failed: {e}")
+
+# Shared compactor, started and stopped by the application lifespan
+report_compactor = ReportCompactor()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run one report expiry and compaction pass.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be changed")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    compactor = ReportCompactor(dry_run=args.dry_run or REPORT_COMPACTION_DRY_RUN)
+    print(json.dumps(asyncio.run(compactor.run_once())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .base import ReportStore, decode_report
+
+_JSON = ".json"
+_GZIP = ".json.gz"
+
+# Leftover temp files from interrupted writes are removed by compaction after this long
+_STALE_TMP_AGE = 3600
+
+def _parse_name(name: str) -> Optional[Tuple[str, str, bool]]:
+    """Split ``{report_id}.{status}.json[.gz]`` into (report_id, status, compressed)"""
+    if name.startswith("."):
+        return None
+    if name.endswith(_GZIP):
+        stem, compressed = name[:-len(_GZIP)], True
+    elif name.endswith(_JSON):
+        stem, compressed = name[:-len(_JSON)], False
+    else:
+        return None
+    report_id, sep, status = stem.rpartition(".")
+    if not sep:
+        return None
+    return report_id, status, compressed
+
+class FileSystemReportStore(ReportStore):
+    """Stores each report as a file in hashed shard directories, written atomically.
+
+    Files are named ``{aa}/{bb}/{report_id}.{status}.json``, where ``aabb`` is the start of
+    the SHA-1 of the report ID, so no directory grows unbounded and compaction can apply
+    per-status TTLs from a directory listing alone. Reports in ``compress_statuses`` are
+    stored gzip-compressed as ``.json.gz``. Flat ``{report_id}.json`` files written by
+    earlier versions are still read and are moved into shards by :meth:`compact`.
+    """
+
+    def __init__(self, directory: Path, compress_statuses: Iterable[str] = ("completed",), compress_level: int = 6):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compress_statuses = frozenset(compress_statuses)
+        self.compress_level = compress_level
+
+    def _shard(self, report_id: str) -> Path:
+        digest = hashlib.sha1(report_id.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / digest[2:4]
+
+    def _legacy_path(self, report_id: str) -> Path:
+        return self.directory / f"{report_id}.json"
+
+    def _variants(self, shard: Path, report_id: str) -> List[os.DirEntry]:
+        variants = []
+        try:
+            with os.scandir(shard) as entries:
+                for entry in entries:
+                    parsed = _parse_name(entry.name) if entry.name.startswith(report_id) else None
+                    if parsed is not None and parsed[0] == report_id:
+                        variants.append(entry)
+        except FileNotFoundError:
+            pass
+        return variants
+
+    def _encode(self, report_id: str, status: Optional[str], body: bytes) -> Tuple[str, bytes]:
+        status = status or "unknown"
+        if status in self.compress_statuses:
+            return f"{report_id}.{status}{_GZIP}", gzip.compress(body, compresslevel=self.compress_level, mtime=0)
+        return f"{report_id}.{status}{_JSON}", body
+
+    def _write_tmp(self, directory: Path, name: str, data: bytes) -> str:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path
+
+    def _remove_other_variants(self, shard: Path, report_id: str, keep: str) -> None:
+        # The status is part of the file name, so drop the file of the previous status
+        for entry in self._variants(shard, report_id):
+            if entry.name != keep:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+        try:
+            os.unlink(self._legacy_path(report_id))
+        except FileNotFoundError:
+            pass
+
+    def write(self, report_id: str, status: Optional[str], body: bytes) -> None:
+        name, data = self._encode(report_id, status, body)
+        shard = self._shard(report_id)
+        # Write to a temp file in the same directory and rename it over the target,
+        # so concurrent readers see either the old or the new document, never a partial one
+        tmp_path = self._write_tmp(shard, name, data)
+        try:
+            os.replace(tmp_path, shard / name)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._remove_other_variants(shard, report_id, name)
+
+    def _rewrite(self, source: os.DirEntry, report_id: str, status: Optional[str]) -> None:
+        """Re-store a file in its current format and shard, keeping its mtime (and so its TTL age).
+
+        Skipped if the source changes meanwhile, so compaction never overwrites a newer save.
+        """
+        original = source.stat()
+        with open(source.path, "rb") as f:
+            body = f.read()
+        name, data = self._encode(report_id, status, body)
+        shard = self._shard(report_id)
+        tmp_path = self._write_tmp(shard, name, data)
+        try:
+            os.utime(tmp_path, ns=(original.st_atime_ns, original.st_mtime_ns))
+            if os.stat(source.path).st_mtime_ns != original.st_mtime_ns:
+                raise FileNotFoundError(source.path)
+            os.replace(tmp_path, shard / name)
+        except FileNotFoundError:
+            os.unlink(tmp_path)
+            return
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        if os.path.abspath(source.path) != os.path.abspath(shard / name):
+            os.unlink(source.path)
+
+    def read(self, report_id: str) -> Optional[bytes]:
+        shard = self._shard(report_id)
+        # A concurrent status change may remove the file between listing and opening it
+        for _ in range(3):
+            variants = self._variants(shard, report_id)
+            if not variants:
+                break
+            entry = max(variants, key=lambda e: e.stat().st_mtime_ns)
+            try:
+                with open(entry.path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            return gzip.decompress(data) if entry.name.endswith(_GZIP) else data
+
+        try:
+            with open(self._legacy_path(report_id), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def iter_reports(self, statuses: Optional[Iterable[str]] = None, updated_since: Optional[float] = None) -> Iterator[Tuple[str, bytes]]:
+        statuses = frozenset(statuses) if statuses is not None else None
+        since_ns = int(updated_since * 1e9) if updated_since is not None else None
+        with os.scandir(self.directory) as top:
+            root_entries = list(top)
+
+        for entry in root_entries:
+            if entry.is_file() and entry.name.endswith(_JSON) and not entry.name.startswith("."):
+                if since_ns is not None and entry.stat().st_mtime_ns < since_ns:
+                    continue
+                body = self._read_file(entry.path, compressed=False)
+                if body is not None and (statuses is None or decode_report(body).get("status") in statuses):
+                    yield entry.name[:-len(_JSON)], body
+
+        for level1 in root_entries:
+            if not level1.is_dir() or len(level1.name) != 2:
+                continue
+            with os.scandir(level1.path) as shards:
+                shard_dirs = [shard.path for shard in shards if shard.is_dir()]
+            for shard in shard_dirs:
+                with os.scandir(shard) as entries:
+                    files = list(entries)
+                # The status is in the file name, so filtering needs no reads; a report caught
+                # mid status change has two files and the newer one is used
+                newest: Dict[str, Tuple[int, os.DirEntry]] = {}
+                for entry in files:
+                    parsed = _parse_name(entry.name)
+                    if parsed is None:
+                        continue
+                    try:
+                        mtime_ns = entry.stat().st_mtime_ns
+                    except FileNotFoundError:
+                        continue
+                    if parsed[0] not in newest or mtime_ns > newest[parsed[0]][0]:
+                        newest[parsed[0]] = (mtime_ns, entry)
+                for report_id, (mtime_ns, entry) in newest.items():
+                    if statuses is not None and _parse_name(entry.name)[1] not in statuses:
+                        continue
+                    if since_ns is not None and mtime_ns < since_ns:
+                        continue
+                    body = self._read_file(entry.path, compressed=entry.name.endswith(_GZIP))
+                    if body is not None:
+                        yield report_id, body
+
+    def _read_file(self, path: str, compressed: bool) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return gzip.decompress(data) if compressed else data
+
+    def compact(self, ttls: Dict[str, float], dry_run: bool = False) -> dict:
+        """Expire reports past their status TTL, compress, and move legacy flat files into shards.
+
+        With ``dry_run`` nothing is changed; the returned counts describe what would be done.
+        """
+        stats = {"scanned": 0, "expired": 0, "compressed": 0, "migrated": 0, "removed_tmp": 0, "expired_ids": []}
+        now = time.time()
+
+        def remove(path: str) -> None:
+            if not dry_run:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+        with os.scandir(self.directory) as top:
+            root_entries = list(top)
+
+        for entry in root_entries:
+            if entry.is_file() and entry.name.endswith(_JSON) and not entry.name.startswith("."):
+                report_id = entry.name[:-len(_JSON)]
+                stats["scanned"] += 1
+                stats["migrated"] += 1
+                if not dry_run:
+                    with open(entry.path, "rb") as f:
+                        status = decode_report(f.read()).get("status")
+                    self._rewrite(entry, report_id, status)
+
+        for level1 in root_entries:
+            if not level1.is_dir() or len(level1.name) != 2:
+                continue
+            with os.scandir(level1.path) as shards:
+                shard_dirs = [shard for shard in shards if shard.is_dir()]
+            for shard in shard_dirs:
+                with os.scandir(shard.path) as entries:
+                    files = list(entries)
+                for entry in files:
+                    age = now - entry.stat().st_mtime
+                    if entry.name.startswith("."):
+                        if entry.name.endswith(".tmp") and age > _STALE_TMP_AGE:
+                            stats["removed_tmp"] += 1
+                            remove(entry.path)
+                        continue
+                    parsed = _parse_name(entry.name)
+                    if parsed is None:
+                        continue
+                    report_id, status, compressed = parsed
+                    stats["scanned"] += 1
+
+                    ttl = ttls.get(status)
+                    if ttl and age > ttl:
+                        stats["expired"] += 1
+                        stats["expired_ids"].append(report_id)
+                        remove(entry.path)
+                    elif status in self.compress_statuses and not compressed:
+                        stats["compressed"] += 1
+                        if not dry_run:
+                            self._rewrite(entry, report_id, status)
+
+        return stats
@@ -0,0 +1,76 @@
+import asyncio
+import os
+from typing import AsyncIterator, Dict, Optional, Set
+from ..metrics import REPORT_WAITERS
+from . import add_save_listener, get_report_entry
+from .cache import TERMINAL_STATUSES, CachedReport
+
+# Waiters re-read the report at least this often, so saves made by other processes
+# (which this process is not notified of) are still picked up
+REPORT_WAIT_RECHECK = float(os.getenv("REPORT_WAIT_RECHECK", "5"))
+REPORT_WAIT_MAX_TIMEOUT = float(os.getenv("REPORT_WAIT_MAX_TIMEOUT", "60"))
+# WebSocket subscriptions are closed after this many seconds even if the report is still running
+REPORT_WS_MAX_LIFETIME = float(os.getenv("REPORT_WS_MAX_LIFETIME", "1800"))
+
+class ReportNotifier:
+    """In-process hub that wakes waiters when a report is saved"""
+
+    def __init__(self):
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(futures) for futures in self._waiters.values())
+
+    def subscribe(self, report_id: str) -> asyncio.Future:
+        """Return a future resolved with the report's status on its next save"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(report_id, set()).add(future)
+        return future
+
+    def unsubscribe(self, report_id: str, future: asyncio.Future) -> None:
+        futures = self._waiters.get(report_id)
+        if futures is not None:
+            futures.discard(future)
+            if not futures:
+                del self._waiters[report_id]
+
+    def publish(self, report_id: str, report_data: dict) -> None:
+        for future in self._waiters.pop(report_id, ()):
+            if not future.done():
+                future.set_result(report_data.get("status"))
+
+async def watch_report(report_id: str, timeout: Optional[float] = None) -> AsyncIterator[CachedReport]:
+    """Yield the report now and again each time its status changes.
+
+    Stops after a terminal status, when the report does not exist, or after ``timeout`` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    last_status = object()
+    while True:
+        # Subscribe before reading, so a save between the read and the wait is not missed
+        future = report_notifier.subscribe(report_id)
+        try:
+            entry = await get_report_entry(report_id)
+            if entry is None:
+                return
+            if entry.status != last_status:
+                last_status = entry.status
+                yield entry
+                if entry.status in TERMINAL_STATUSES:
+                    return
+            wait = REPORT_WAIT_RECHECK if deadline is None else min(REPORT_WAIT_RECHECK, deadline - loop.time())
+            if wait <= 0:
+                return
+            try:
+                await asyncio.wait_for(future, wait)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            report_notifier.unsubscribe(report_id, future)
+
+# Shared hub, fed by every report save
+report_notifier = ReportNotifier()
+add_save_listener(report_notifier.publish)
+REPORT_WAITERS.set_function(lambda: report_notifier.waiting)
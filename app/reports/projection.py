@@ -0,0 +1,50 @@
+from typing import Any, Dict, List, Tuple
+from ..models.models import ValidationReport
+from .base import decode_report, encode_report
+from .cache import CachedReport
+
+# Projected bodies kept per cached report, one per distinct field selection
+MAX_PROJECTIONS_PER_REPORT = 16
+
+REPORT_FIELDS = frozenset(ValidationReport.model_fields)
+
+def parse_fields(fields: str) -> Tuple[str, ...]:
+    """Parse a comma-separated list of (optionally dotted) analysis fields.
+
+    Raises ValueError naming any field that is not part of a ValidationReport.
+    """
+    paths = tuple(sorted({field.strip() for field in fields.split(",") if field.strip()}))
+    unknown = [path for path in paths if path.split(".", 1)[0] not in REPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown report fields: {', '.join(unknown)}")
+    return paths
+
+def _copy_path(source: Dict[str, Any], target: Dict[str, Any], keys: List[str]) -> None:
+    value: Any = source
+    for key in keys:
+        if not isinstance(value, dict) or key not in value:
+            return
+        value = value[key]
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    target[keys[-1]] = value
+
+def project_report(body: bytes, paths: Tuple[str, ...]) -> bytes:
+    """Keep only the given fields of the report's ``analysis``; other top-level keys are unchanged"""
+    report = decode_report(body)
+    analysis = report.get("analysis")
+    if isinstance(analysis, dict):
+        projected: Dict[str, Any] = {}
+        for path in paths:
+            _copy_path(analysis, projected, path.split("."))
+        report["analysis"] = projected
+    return encode_report(report)
+
+def project_entry(entry: CachedReport, paths: Tuple[str, ...]) -> CachedReport:
+    """Projected version of a cached report, with its own ETag, memoized on the entry"""
+    projected = entry.projections.get(paths)
+    if projected is None:
+        projected = CachedReport(project_report(entry.body, paths), entry.status, ttl=0)
+        if len(entry.projections) < MAX_PROJECTIONS_PER_REPORT:
+            entry.projections[paths] = projected
+    return projected
@@ -0,0 +1,192 @@
+"""In-memory near-duplicate index over completed reports.
+
+Each report's idea, problem and solution text is embedded as a hashed word unigram and
+bigram vector (no vocabulary to maintain, so reports are added one at a time) and kept
+L2-normalized in a NumPy matrix. A search is one matrix-vector product plus a partial
+sort. It is bound by memory bandwidth: with the default 128 dimensions 100k reports take
+50 MB and a search takes a few milliseconds on one core.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from ..metrics import SIMILARITY_INDEX_SIZE, SIMILARITY_SEARCH_DURATION
+from . import add_save_listener, get_store
+from .base import decode_report
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_INDEX_ENABLED = os.getenv("SIMILARITY_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+SIMILARITY_DIM = int(os.getenv("SIMILARITY_DIM", "128"))
+# Seconds between rescans for reports completed by other processes (0 disables them)
+SIMILARITY_INDEX_REFRESH = float(os.getenv("SIMILARITY_INDEX_REFRESH", "300"))
+
+SIMILARITY_FIELDS = ("idea", "problem", "solution")
+
+_WORD = re.compile(r"[^\W_]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have in into is it its of on or our that the their them "
+    "they this to was we were which who will with".split()
+)
+
+def idea_text(source: Any) -> str:
+    """Join the indexed fields of a StartupIdea or its dict form"""
+    if isinstance(source, dict):
+        return " ".join(str(source.get(field) or "") for field in SIMILARITY_FIELDS)
+    return " ".join(str(getattr(source, field, "") or "") for field in SIMILARITY_FIELDS)
+
+def embed_text(text: str, dim: int = SIMILARITY_DIM) -> Optional[np.ndarray]:
+    """Signed feature-hashing vector of the text's words and word pairs, L2-normalized"""
+    words = [word for word in _WORD.findall(text.casefold()) if word not in _STOPWORDS]
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return None
+    hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features), dtype=np.uint32, count=len(features))
+    vector = np.zeros(dim, dtype=np.float32)
+    # The top bit picks the sign, so colliding features tend to cancel rather than add up
+    np.add.at(vector, hashes % dim, np.where(hashes >> 31, -1.0, 1.0).astype(np.float32))
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else None
+
+def _report_source(report_data: dict) -> Optional[Any]:
+    """The submission a completed analysis report was generated from"""
+    if report_data.get("status") != "completed" or report_data.get("kind") == "batch":
+        return None
+    analysis = report_data.get("analysis")
+    if isinstance(analysis, dict):
+        return analysis.get("startup_data")
+    return getattr(analysis, "startup_data", None)
+
+class SimilarityIndex:
+    """Top-k cosine similarity search over completed reports"""
+
+    def __init__(self, dim: int = SIMILARITY_DIM, refresh_interval: float = SIMILARITY_INDEX_REFRESH):
+        self.dim = dim
+        self.refresh_interval = refresh_interval
+        self._matrix = np.zeros((1024, dim), dtype=np.float32)
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        # Taken by searches and updates; loads run in a thread while saves update from the loop
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+
+    @property
+    def size(self) -> int:
+        return len(self._rows)
+
+    def add(self, report_id: str, vector: np.ndarray) -> None:
+        with self._lock:
+            row = self._rows.get(report_id)
+            if row is None:
+                row = self._free.pop() if self._free else self._append_row()
+                self._rows[report_id] = row
+                self._ids[row] = report_id
+            self._matrix[row] = vector
+
+    def _append_row(self) -> int:
+        row = len(self._ids)
+        if row == len(self._matrix):
+            grown = np.zeros((2 * len(self._matrix), self.dim), dtype=np.float32)
+            grown[:row] = self._matrix
+            self._matrix = grown
+        self._ids.append(None)
+        return row
+
+    def remove(self, report_id: str) -> None:
+        with self._lock:
+            row = self._rows.pop(report_id, None)
+            if row is not None:
+                # Zeroed rows score 0 and are skipped, and the row is reused by the next add
+                self._matrix[row] = 0
+                self._ids[row] = None
+                self._free.append(row)
+
+    def search(self, vector: np.ndarray, k: int = 5, min_score: float = 0.0, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (report_id, cosine similarity) pairs, best first"""
+        exclude = set(exclude)
+        with SIMILARITY_SEARCH_DURATION.time(), self._lock:
+            count = len(self._ids)
+            if count == 0 or k <= 0:
+                return []
+            scores = self._matrix[:count] @ vector
+            # With a threshold (as for analysis reuse) usually only a handful of rows qualify
+            candidates = np.flatnonzero(scores >= min_score) if min_score > 0 else np.arange(count)
+            take = min(k + len(exclude), len(candidates))
+            if take == 0:
+                return []
+            top = candidates[np.argpartition(scores[candidates], len(candidates) - take)[len(candidates) - take:]]
+            top = top[np.argsort(scores[top])[::-1]]
+            results = []
+            for row in top:
+                report_id, score = self._ids[row], float(scores[row])
+                if score < min_score or len(results) == k:
+                    break
+                if report_id is not None and report_id not in exclude:
+                    results.append((report_id, score))
+            return results
+
+    def search_text(self, text: str, k: int = 5, min_score: float = 0.0, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        vector = embed_text(text, self.dim)
+        return self.search(vector, k, min_score, exclude) if vector is not None else []
+
+    def index_report(self, report_id: str, report_data: dict) -> None:
+        """Add a completed report, or drop a report that is no longer completed"""
+        source = _report_source(report_data)
+        vector = embed_text(idea_text(source), self.dim) if source is not None else None
+        if vector is not None:
+            self.add(report_id, vector)
+        elif report_id in self._rows:
+            self.remove(report_id)
+
+    def load(self, updated_since: Optional[float] = None) -> int:
+        """Index completed reports from the store; blocking, run it off the event loop"""
+        loaded = 0
+        for report_id, body in get_store().iter_reports(statuses=("completed",), updated_since=updated_since):
+            try:
+                self.index_report(report_id, decode_report(body))
+                loaded += 1
+            except Exception as e:
+                logger.warning(f"Could not index report {report_id}: {e}")
+        return loaded
+
+    async def start(self) -> None:
+        if self._task is None and SIMILARITY_INDEX_ENABLED:
+            self._task = asyncio.create_task(self._run(), name="similarity-index")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        # Built in the background, so startup does not wait for a scan of the whole store
+        started = time.time()
+        try:
+            loaded = await asyncio.to_thread(self.load)
+            logger.info(f"Similarity index loaded {loaded} reports in {time.time() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Loading the similarity index failed: {e}")
+        self.ready = True
+        while self.refresh_interval > 0:
+            await asyncio.sleep(self.refresh_interval)
+            # Overlap the previous scan a little so saves racing it are not missed
+            since, started = started - 1, time.time()
+            try:
+                await asyncio.to_thread(self.load, since)
+            except Exception as e:
+                logger.error(f"Refreshing the similarity index failed: {e}")
+
+# Shared index, kept current by report saves in this process and periodic rescans
+similarity_index = SimilarityIndex()
+if SIMILARITY_INDEX_ENABLED:
+    add_save_listener(similarity_index.index_report)
+SIMILARITY_INDEX_SIZE.set_function(lambda: similarity_index.size)
@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .base import ReportStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    status TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_status ON reports (status);
+CREATE INDEX IF NOT EXISTS idx_reports_created_at ON reports (created_at);
+"""
+
+class SQLiteReportStore(ReportStore):
+    """Stores reports in an embedded SQLite database running in WAL mode"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers proceed while a writer commits
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def write(self, report_id: str, status: Optional[str], body: bytes) -> None:
+        now = datetime.now().isoformat()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO reports (id, status, created_at, updated_at, data)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    status = excluded.status,
+                    updated_at = excluded.updated_at,
+                    data = excluded.data
+                """,
+                (report_id, status, now, now, body.decode("utf-8")),
+            )
+
+    def read(self, report_id: str) -> Optional[bytes]:
+        row = self._connection().execute("SELECT data FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return row[0].encode("utf-8") if row else None
+
+    def compact(self, ttls: Dict[str, float], dry_run: bool = False) -> dict:
+        conn = self._connection()
+        stats = {"scanned": conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0], "expired": 0, "expired_ids": []}
+        for status, ttl in ttls.items():
+            if not ttl:
+                continue
+            cutoff = (datetime.now() - timedelta(seconds=ttl)).isoformat()
+            rows = conn.execute("SELECT id FROM reports WHERE status = ? AND updated_at < ?", (status, cutoff)).fetchall()
+            stats["expired"] += len(rows)
+            stats["expired_ids"].extend(row[0] for row in rows)
+            if rows and not dry_run:
+                with conn:
+                    conn.execute("DELETE FROM reports WHERE status = ? AND updated_at < ?", (status, cutoff))
+        return stats
+
+    def iter_reports(self, statuses: Optional[Iterable[str]] = None, updated_since: Optional[float] = None) -> Iterator[Tuple[str, bytes]]:
+        query, params = "SELECT id, data FROM reports WHERE 1 = 1", []
+        if statuses is not None:
+            statuses = list(statuses)
+            query += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        if updated_since is not None:
+            query += " AND updated_at >= ?"
+            params.append(datetime.fromtimestamp(updated_since).isoformat())
+        # A dedicated connection, so a slow consumer does not hold this thread's connection mid-query
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            for report_id, data in conn.execute(query, params):
+                yield report_id, data.encode("utf-8")
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
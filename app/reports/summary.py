@@ -0,0 +1,397 @@
+"""Columnar summary index of reports for listing and aggregate queries.
+
+A few fields of every report (status, creation time, viability score, competition
+level, YC overall score) are kept in NumPy arrays, one per column, updated on every
+save. Listing, filtering and stats are vectorized over those arrays and never read the
+report documents. The index is snapshotted to disk so a restart only rescans reports
+saved since the snapshot.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from . import REPORTS_DIR, add_save_listener, get_store
+from .base import decode_report
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INDEX_PATH = Path(os.getenv("SUMMARY_INDEX_PATH", REPORTS_DIR / "summary-index.npz"))
+# Seconds between rescans for reports saved by other processes, each followed by a snapshot (0 disables them)
+SUMMARY_INDEX_REFRESH = float(os.getenv("SUMMARY_INDEX_REFRESH", "60"))
+
+SORT_FIELDS = ("created_at", "viability_score", "yc_overall_score")
+
+# Report IDs are UUIDs; longer IDs are not indexed
+_ID_DTYPE = "S64"
+_TIMESTAMP_FIELDS = ("completed_at", "failed_at", "started_at", "queued_at")
+
+def _timestamp(value: Any) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+def _get(source: Any, name: str) -> Any:
+    return source.get(name) if isinstance(source, dict) else getattr(source, name, None)
+
+def _score(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+def encode_cursor(sort: str, descending: bool, value: float, report_id: str) -> str:
+    payload = json.dumps([sort, descending, value, report_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[float, str]:
+    """Raises ValueError for malformed cursors or ones issued for another sort order"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_sort, cursor_descending, value, report_id = payload
+        value = float(value)
+    except Exception as e:
+        raise ValueError("Invalid cursor.") from e
+    if cursor_sort != sort or cursor_descending != descending or not isinstance(report_id, str):
+        raise ValueError("The cursor belongs to a different sort order.")
+    return value, report_id
+
+class _Vocabulary:
+    """Small categorical dictionary; values are stored as int16 codes, -1 for missing"""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = list(names)
+        self._codes = {name: code for code, name in enumerate(self.names)}
+
+    def code(self, name: Optional[str]) -> int:
+        if name is None:
+            return -1
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def lookup(self, names: Iterable[str]) -> List[int]:
+        return [self._codes[name] for name in names if name in self._codes]
+
+class SummaryIndex:
+    """Array-backed summary of every report, for listing and stats without reading documents"""
+
+    _COLUMNS = {
+        "ids": _ID_DTYPE,
+        "status": np.int16,
+        "created_at": np.float64,
+        "updated_at": np.float64,
+        "viability_score": np.float64,
+        "competition_level": np.int16,
+        "yc_overall_score": np.float64,
+        "alive": np.bool_,
+    }
+
+    def __init__(self, path: Path = SUMMARY_INDEX_PATH, refresh_interval: float = SUMMARY_INDEX_REFRESH):
+        self.path = Path(path)
+        self.refresh_interval = refresh_interval
+        self._columns = {name: np.zeros(1024, dtype=dtype) for name, dtype in self._COLUMNS.items()}
+        self._count = 0
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._statuses = _Vocabulary()
+        self._competition_levels = _Vocabulary()
+        # Start time of the last full or incremental scan of the store
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+
+    @property
+    def size(self) -> int:
+        return len(self._rows)
+
+    def _append_row(self) -> int:
+        row = self._count
+        if row == len(self._columns["ids"]):
+            for name, column in self._columns.items():
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:row] = column
+                self._columns[name] = grown
+        self._count += 1
+        return row
+
+    def index_report(self, report_id: str, report_data: dict, updated_at: Optional[float] = None) -> None:
+        """Insert or replace the summary of a report; batch manifests are skipped"""
+        if report_data.get("kind") == "batch":
+            return
+        encoded_id = report_id.encode("utf-8")
+        if len(encoded_id) > 64:
+            return
+        analysis = report_data.get("analysis")
+        yc = _get(analysis, "yc_criteria_assessment") if analysis is not None else None
+        competition = _get(analysis, "competition_level") if analysis is not None else None
+        timestamps = [_timestamp(report_data.get(field)) for field in _TIMESTAMP_FIELDS]
+        if updated_at is None:
+            updated_at = max((t for t in timestamps if t is not None), default=time.time())
+        created_at = _timestamp(report_data.get("queued_at")) or _timestamp(_get(analysis, "created_at") if analysis is not None else None) or updated_at
+
+        with self._lock:
+            row = self._rows.get(report_id)
+            if row is None:
+                row = self._free.pop() if self._free else self._append_row()
+                self._rows[report_id] = row
+            columns = self._columns
+            columns["ids"][row] = encoded_id
+            columns["status"][row] = self._statuses.code(report_data.get("status"))
+            columns["created_at"][row] = created_at
+            columns["updated_at"][row] = updated_at
+            columns["viability_score"][row] = _score(_get(analysis, "viability_score") if analysis is not None else None)
+            columns["competition_level"][row] = self._competition_levels.code(str(competition).strip().title() if competition else None)
+            columns["yc_overall_score"][row] = _score(_get(yc, "overall_score") if yc is not None else None)
+            columns["alive"][row] = True
+
+    def record_save(self, report_id: str, report_data: dict) -> None:
+        """Save listener: index the report as updated now"""
+        self.index_report(report_id, report_data, time.time())
+
+    def remove(self, report_id: str) -> None:
+        with self._lock:
+            row = self._rows.pop(report_id, None)
+            if row is not None:
+                self._columns["alive"][row] = False
+                self._free.append(row)
+
+    def expire(self, ttls: Dict[str, float]) -> int:
+        """Drop reports past their status TTL, mirroring compaction done by other processes"""
+        now = time.time()
+        with self._lock:
+            columns, count = self._columns, self._count
+            expired = np.zeros(count, dtype=bool)
+            for status, ttl in ttls.items():
+                codes = self._statuses.lookup([status])
+                if ttl and codes:
+                    expired |= (columns["status"][:count] == codes[0]) & (columns["updated_at"][:count] < now - ttl)
+            rows = np.flatnonzero(expired & columns["alive"][:count])
+        for row in rows:
+            self.remove(columns["ids"][row].decode("utf-8"))
+        return len(rows)
+
+    def _mask(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        competition_levels: Optional[Iterable[str]] = None,
+        created_after: Optional[float] = None,
+        created_before: Optional[float] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+    ) -> np.ndarray:
+        count, columns = self._count, self._columns
+        mask = columns["alive"][:count].copy()
+        if statuses is not None:
+            mask &= np.isin(columns["status"][:count], self._statuses.lookup(statuses))
+        if competition_levels is not None:
+            codes = self._competition_levels.lookup(level.strip().title() for level in competition_levels)
+            mask &= np.isin(columns["competition_level"][:count], codes)
+        if created_after is not None:
+            mask &= columns["created_at"][:count] >= created_after
+        if created_before is not None:
+            mask &= columns["created_at"][:count] < created_before
+        # Comparisons with NaN are false, so reports without a score drop out of score filters
+        if min_score is not None:
+            mask &= columns["viability_score"][:count] >= min_score
+        if max_score is not None:
+            mask &= columns["viability_score"][:count] <= max_score
+        return mask
+
+    def _item(self, row: int) -> dict:
+        columns = self._columns
+        status, competition = columns["status"][row], columns["competition_level"][row]
+        return {
+            "report_id": columns["ids"][row].decode("utf-8"),
+            "status": self._statuses.names[status] if status >= 0 else None,
+            "created_at": datetime.fromtimestamp(columns["created_at"][row]).isoformat(),
+            "updated_at": datetime.fromtimestamp(columns["updated_at"][row]).isoformat(),
+            "viability_score": _optional(columns["viability_score"][row]),
+            "competition_level": self._competition_levels.names[competition] if competition >= 0 else None,
+            "yc_overall_score": _optional(columns["yc_overall_score"][row]),
+        }
+
+    def query(self, sort: str = "created_at", descending: bool = True, limit: int = 50, cursor: Optional[str] = None, **filters: Any) -> Tuple[List[dict], Optional[str]]:
+        """Return one page of report summaries and the cursor of the next page.
+
+        Ties on the sort value are broken by report ID, so pages are stable across calls
+        and across processes. Reports without a value for the sort field are left out.
+        """
+        after = decode_cursor(cursor, sort, descending) if cursor else None
+        with self._lock:
+            mask = self._mask(**filters)
+            values = self._columns[sort][:self._count]
+            rows = np.flatnonzero(mask & ~np.isnan(values))
+            values = values[rows]
+            ids = self._columns["ids"][rows]
+            if after is not None:
+                value, report_id = after
+                beyond = values < value if descending else values > value
+                keep = beyond | ((values == value) & (ids > report_id.encode("utf-8")))
+                rows, values, ids = rows[keep], values[keep], ids[keep]
+
+            key = -values if descending else values
+            remaining = len(rows)
+            if remaining > limit:
+                # Narrow to the rows that can be on this page before the full sort
+                kth = np.partition(key, limit - 1)[limit - 1]
+                candidates = key <= kth
+                rows, ids, key = rows[candidates], ids[candidates], key[candidates]
+            page = rows[np.lexsort((ids, key))[:limit]]
+            items = [self._item(row) for row in page]
+            next_cursor = None
+            if remaining > limit:
+                last = page[-1]
+                next_cursor = encode_cursor(sort, descending, float(self._columns[sort][last]), self._columns["ids"][last].decode("utf-8"))
+        return items, next_cursor
+
+    def stats(self, **filters: Any) -> dict:
+        """Counts by status and competition level, and score distributions"""
+        with self._lock:
+            mask = self._mask(**filters)
+            columns, count = self._columns, self._count
+            status_codes = columns["status"][:count][mask]
+            competition_codes = columns["competition_level"][:count][mask]
+            scores = {name: columns[name][:count][mask] for name in ("viability_score", "yc_overall_score")}
+            statuses, competition_levels = list(self._statuses.names), list(self._competition_levels.names)
+
+        def counts(codes: np.ndarray, names: List[str]) -> Dict[str, int]:
+            tally = np.bincount(codes[codes >= 0], minlength=len(names))
+            return {name: int(n) for name, n in zip(names, tally) if n}
+
+        def distribution(values: np.ndarray) -> dict:
+            values = values[~np.isnan(values)]
+            if not len(values):
+                return {"count": 0}
+            p50, p90 = np.percentile(values, (50, 90))
+            return {
+                "count": int(len(values)),
+                "mean": round(float(values.mean()), 3),
+                "min": float(values.min()),
+                "max": float(values.max()),
+                "p50": round(float(p50), 3),
+                "p90": round(float(p90), 3),
+            }
+
+        return {
+            "count": int(mask.sum()),
+            "by_status": counts(status_codes, statuses),
+            "by_competition_level": counts(competition_codes, competition_levels),
+            "viability_score": distribution(scores["viability_score"]),
+            "yc_overall_score": distribution(scores["yc_overall_score"]),
+        }
+
+    def load(self, updated_since: Optional[float] = None) -> int:
+        """Index reports from the store; blocking, run it off the event loop"""
+        started = time.time()
+        loaded = 0
+        for report_id, body in get_store().iter_reports(updated_since=updated_since):
+            try:
+                self.index_report(report_id, decode_report(body))
+                loaded += 1
+            except Exception as e:
+                logger.warning(f"Could not summarize report {report_id}: {e}")
+        self._synced_at = started
+        return loaded
+
+    def save_snapshot(self) -> None:
+        """Write the index to disk atomically; blocking"""
+        if self._synced_at is None:
+            return
+        with self._lock:
+            arrays = {name: column[:self._count].copy() for name, column in self._columns.items()}
+            statuses = np.array(self._statuses.names, dtype=str)
+            competition_levels = np.array(self._competition_levels.names, dtype=str)
+            synced_at = self._synced_at
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            np.savez(f, statuses=statuses, competition_levels=competition_levels, synced_at=np.float64(synced_at), **arrays)
+        os.replace(tmp_path, self.path)
+
+    def load_snapshot(self) -> bool:
+        """Restore the index from its snapshot; False if there is no usable snapshot"""
+        try:
+            with np.load(self.path) as snapshot:
+                arrays = {name: snapshot[name].astype(dtype) for name, dtype in self._COLUMNS.items()}
+                statuses = [str(name) for name in snapshot["statuses"]]
+                competition_levels = [str(name) for name in snapshot["competition_levels"]]
+                synced_at = float(snapshot["synced_at"])
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable summary index snapshot {self.path}: {e}")
+            return False
+
+        count = len(arrays["ids"])
+        with self._lock:
+            self._columns = {}
+            for name, values in arrays.items():
+                column = np.zeros(max(1024, 2 * count), dtype=self._COLUMNS[name])
+                column[:count] = values
+                self._columns[name] = column
+            self._count = count
+            alive = arrays["alive"]
+            self._rows = {arrays["ids"][row].decode("utf-8"): int(row) for row in np.flatnonzero(alive)}
+            self._free = [int(row) for row in np.flatnonzero(~alive)]
+            self._statuses = _Vocabulary(statuses)
+            self._competition_levels = _Vocabulary(competition_levels)
+            self._synced_at = synced_at
+        return True
+
+    def _restore(self) -> int:
+        if self.load_snapshot():
+            # Overlap the snapshot's scan a little so saves racing it are not missed
+            return self.load(self._synced_at - 1)
+        return self.load()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="summary-index")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            try:
+                await asyncio.to_thread(self.save_snapshot)
+            except Exception as e:
+                logger.error(f"Saving the summary index snapshot failed: {e}")
+
+    async def _run(self) -> None:
+        started = time.time()
+        try:
+            loaded = await asyncio.to_thread(self._restore)
+            logger.info(f"Summary index ready with {self.size} reports ({loaded} scanned) in {time.time() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Loading the summary index failed: {e}")
+        self.ready = True
+        while self.refresh_interval > 0:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await asyncio.to_thread(self.load, (self._synced_at or started) - 1)
+                await asyncio.to_thread(self.save_snapshot)
+            except Exception as e:
+                logger.error(f"Refreshing the summary index failed: {e}")
+
+# Shared index, kept current by report saves in this process and periodic rescans
+summary_index = SummaryIndex()
+add_save_listener(summary_index.record_save)
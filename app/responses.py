@@ -0,0 +1,11 @@
+# app/responses.py
+
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core's Rust serializer instead of the json module"""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content, fallback=str)
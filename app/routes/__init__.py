@@ -1,3 +1,4 @@
 from .router import router
+from .metrics import router as metrics_router
 
-__all__ = ['router']
\ No newline at end of file
+__all__ = ['router', 'metrics_router']
@@ -1,10 +1,33 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from contextlib import aclosing
 from datetime import datetime
+from typing import List, Optional, Tuple
+import asyncio
+import json
 import uuid
-from ..models.models import StartupIdea, ValidationReport
-from ..services.service import AIAnalysisService
-from ..reports import save_report, get_report
-from ..exceptions import AIAnalysisError, ReportError
+from ..models.models import StartupIdea
+from ..services.pipeline import regenerate_report_section, stream_analysis_events
+from ..services.prompts import SECTION_FIELDS
+from ..services.jobqueue import analysis_queue_capacity, check_analysis_capacity, submit_analysis
+from ..services.dedup import IdempotencyKeyReused, submission_fingerprint, submission_registry
+from ..services.batch import (
+    BATCH_MAX_BYTES,
+    BATCH_MAX_ITEMS,
+    batch_progress,
+    get_batch,
+    get_batch_items,
+    parse_batch_file,
+    submit_batch,
+    validate_batch_rows,
+)
+from ..reports import save_report, get_report, get_report_entry
+from ..reports.cache import TERMINAL_STATUSES, CachedReport
+from ..reports.notifications import REPORT_WAIT_MAX_TIMEOUT, REPORT_WS_MAX_LIFETIME, watch_report
+from ..reports.projection import parse_fields, project_entry
+from ..reports.similarity import SIMILARITY_INDEX_ENABLED, idea_text, similarity_index
+from ..reports.summary import SORT_FIELDS, summary_index
+from ..exceptions import QueueFullError
 
 # Create router
 router = APIRouter()
@@ -15,73 +38,345 @@ async def root():
 
 @router.post("/analyze")
 async def analyze_startup(
-    background_tasks: BackgroundTasks,
-    startup_data: StartupIdea = Depends(StartupIdea.as_form)
+    startup_data: StartupIdea = Depends(StartupIdea.as_form),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
-    """Analyze startup idea and generate validation report"""
+    """Queue a startup idea for analysis and return its report ID immediately.
+
+    Retries with the same Idempotency-Key, and identical submissions while the first is
+    still running, return the existing report instead of starting another analysis.
+    """
+    
+    fingerprint = submission_fingerprint(startup_data)
+    try:
+        existing_id = submission_registry.lookup(fingerprint, idempotency_key)
+    except IdempotencyKeyReused:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different submission.")
+    if existing_id is not None:
+        existing = await get_report(existing_id)
+        status = existing.get("status") if existing is not None else None
+        # Analyses run by worker processes are not released in this process; catch up here
+        if status in TERMINAL_STATUSES:
+            submission_registry.release(existing_id, reusable=status != "failed")
+        if existing is not None and status != "failed":
+            return {"report_id": existing_id, "status": status, "deduplicated": True}
     
     report_id = str(uuid.uuid4())
+    queued_at = datetime.now().isoformat()
     
+    # Registered before the first await so concurrent duplicates attach to this report
+    submission_registry.register(report_id, fingerprint, idempotency_key)
     try:
-        # Initialize report status
-        initial_status = {"status": "processing"}
-        save_report(report_id, initial_status)
-        
-        # Create AI service instance and run analysis
-        ai_service = AIAnalysisService()
-        analysis_result = await ai_service.analyze_startup(startup_data)
-        
-        if analysis_result.get("type") == "clarification_request":
-            clarification_data = {
-                "status": "clarification_needed", 
-                "message": analysis_result.get("message", "The AI requires more information to proceed.")
-            }
-            save_report(report_id, clarification_data)
-            return {"report_id": report_id, "status": "clarification_needed", "message": clarification_data["message"]}
-
-        if analysis_result.get("type") == "analysis":
-            report = ValidationReport(
-                id=report_id,
-                startup_data=startup_data,
-                viability_score=analysis_result["data"]["viability_score"],
-                market_size=analysis_result["data"]["market_size"],
-                competition_level=analysis_result["data"]["competition_level"],
-                time_to_market=analysis_result["data"]["time_to_market"],
-                market_analysis=analysis_result["data"]["market_analysis"],
-                risk_assessment=analysis_result["data"]["risk_assessment"],
-                recommendations=analysis_result["data"]["recommendations"],
-                financial_projections=analysis_result["data"]["financial_projections"],
-                action_plan=analysis_result["data"]["action_plan"],
-                competitive_landscape=analysis_result["data"]["competitive_landscape"],
-                founder_market_fit=analysis_result["data"]["founder_market_fit"],
-                yc_criteria_assessment=analysis_result["data"]["yc_criteria_assessment"],
-                created_at=datetime.now()
-            )
-            
-            report_data = {"status": "completed", "analysis": report.dict()}
-            save_report(report_id, report_data)
-            
-            return {"report_id": report_id, "status": "completed"}
-        
-        # If the AI service returns a valid but unexpected response type
-        raise AIAnalysisError(f"Unexpected response type from AI service: {analysis_result.get('type')}")
-
-    except Exception as e:
-        # Save a failed status before re-raising the exception for the handler
-        error_data = {"status": "failed", "error": str(e)}
-        save_report(report_id, error_data)
-        # Re-raise the exception to be caught by the centralized handler
+        # Reject before persisting anything when the queue is saturated
+        await check_analysis_capacity()
+        await save_report(report_id, {"status": "queued", "queued_at": queued_at})
+        await submit_analysis(report_id, startup_data, queued_at)
+    except QueueFullError as e:
+        submission_registry.release(report_id, reusable=False)
+        if await get_report_entry(report_id) is not None:
+            await save_report(report_id, {"status": "failed", "error": e.message, "queued_at": queued_at})
         raise
+    except Exception:
+        submission_registry.release(report_id, reusable=False)
+        raise
+    
+    return {"report_id": report_id, "status": "queued"}
+
+@router.post("/analyze/stream")
+async def analyze_startup_stream(
+    startup_data: StartupIdea = Depends(StartupIdea.as_form)
+):
+    """Analyze a startup idea, streaming each report section as a server-sent event"""
+    
+    # Streams call the model directly, but still back off when the analysis queue is saturated
+    await check_analysis_capacity()
+    report_id = str(uuid.uuid4())
+    queued_at = datetime.now().isoformat()
+    return StreamingResponse(
+        stream_analysis_events(report_id, startup_data, queued_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/analyze/batch")
+async def analyze_batch(file: UploadFile = File(...)):
+    """Validate a CSV or JSONL file of startup ideas and analyze them as one batch"""
+    
+    content = await file.read(BATCH_MAX_BYTES + 1)
+    if len(content) > BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Batch file exceeds the maximum size of {BATCH_MAX_BYTES} bytes.")
+    
+    try:
+        rows = parse_batch_file(file.filename, content)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse batch file: {str(e)}")
+    
+    if not rows:
+        raise HTTPException(status_code=400, detail="Batch file contains no records.")
+    # A batch is queued in one go, so it can never be larger than the analysis queue
+    max_items = min(BATCH_MAX_ITEMS, analysis_queue_capacity())
+    if len(rows) > max_items:
+        raise HTTPException(status_code=413, detail=f"Batch contains {len(rows)} records; the maximum is {max_items}.")
+    
+    ideas, errors = validate_batch_rows(rows)
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "Batch validation failed.", "errors": errors})
+    
+    return await submit_batch(ideas)
+
+@router.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Get per-item progress for a batch"""
+    manifest = await get_batch(batch_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail=f"Batch with ID '{batch_id}' not found.")
+    
+    counts = {}
+    items = []
+    batch_items = await get_batch_items(manifest)
+    for index, report_id, report in batch_items:
+        status = report.get("status") if report else "missing"
+        counts[status] = counts.get(status, 0) + 1
+        items.append({"index": index, "report_id": report_id, "status": status})
+    status, completed_at = batch_progress(batch_items)
+    
+    return {
+        "batch_id": batch_id,
+        "status": status,
+        "total": manifest["total"],
+        "counts": counts,
+        "queued_at": manifest.get("queued_at"),
+        "completed_at": completed_at,
+        "items": items,
+    }
+
+@router.get("/batch/{batch_id}/results")
+async def download_batch_results(batch_id: str):
+    """Download every item report of a batch as JSON Lines"""
+    manifest = await get_batch(batch_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail=f"Batch with ID '{batch_id}' not found.")
+    
+    items = await get_batch_items(manifest)
+    
+    def lines():
+        for index, report_id, report in items:
+            yield json.dumps({"index": index, "report_id": report_id, **(report or {"status": "missing"})}) + "\n"
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="batch-{batch_id}.jsonl"'},
+    )
+
+@router.get("/reports")
+async def list_reports(
+    status: Optional[str] = None,
+    competition_level: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    sort: str = Query("created_at", pattern=f"^({'|'.join(SORT_FIELDS)})$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
+):
+    """List report summaries from the summary index, filtered and sorted, one page at a time.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the following page.
+    """
+    try:
+        items, next_cursor = summary_index.query(
+            sort=sort,
+            descending=order == "desc",
+            limit=limit,
+            cursor=cursor,
+            **_summary_filters(status, competition_level, created_after, created_before, min_score, max_score),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor, "complete": summary_index.ready}
+
+@router.get("/reports/stats")
+async def report_stats(
+    status: Optional[str] = None,
+    competition_level: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None
+):
+    """Aggregate counts and score distributions over the reports matching the filters"""
+    stats = summary_index.stats(**_summary_filters(status, competition_level, created_after, created_before, min_score, max_score))
+    return {**stats, "complete": summary_index.ready}
+
+@router.get("/reports/similar")
+async def find_similar_reports(
+    report_id: Optional[str] = None,
+    text: Optional[str] = Query(None, max_length=3000),
+    k: int = Query(5, ge=1, le=50),
+    min_score: float = Query(0.0, ge=0, le=1)
+):
+    """Completed reports whose idea, problem and solution resemble those of `report_id`,
+    or the free `text`, ranked by cosine similarity"""
+    if not SIMILARITY_INDEX_ENABLED:
+        raise HTTPException(status_code=404, detail="Similarity search is disabled.")
+    if (report_id is None) == (text is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of 'report_id' or 'text'.")
+    
+    if report_id is not None:
+        report = await get_report(report_id)
+        if report is None:
+            raise HTTPException(status_code=404, detail=f"Report with ID '{report_id}' not found.")
+        startup_data = (report.get("analysis") or {}).get("startup_data")
+        if startup_data is None:
+            raise HTTPException(status_code=409, detail=f"Report '{report_id}' has no completed analysis to compare.")
+        text = idea_text(startup_data)
+    
+    matches = similarity_index.search_text(text, k=k, min_score=min_score, exclude=(report_id,) if report_id else ())
+    return {
+        "results": [{"report_id": match_id, "score": round(score, 4)} for match_id, score in matches],
+        "indexed": similarity_index.size,
+        "complete": similarity_index.ready,
+    }
 
 @router.get("/report/{report_id}")
-async def get_report_status(report_id: str):
-    """Get validation report by ID"""
+async def get_report_status(report_id: str, request: Request, fields: Optional[str] = None):
+    """Get validation report by ID, answering 304 when the client's ETag is current.
+
+    `fields` (e.g. "viability_score,yc_criteria_assessment") limits the returned analysis.
+    """
+    paths = _parse_fields(fields)
+    entry = await get_report_entry(report_id)
+    
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Report with ID '{report_id}' not found.")
+    
+    return _report_response(entry, request, paths)
+
+@router.get("/report/{report_id}/wait")
+async def wait_for_report(
+    report_id: str,
+    request: Request,
+    timeout: float = Query(30, ge=0, le=REPORT_WAIT_MAX_TIMEOUT),
+    since: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Long-poll: answer once the report's status differs from `since` (default: its
+    current status) or is terminal, or with the unchanged report after `timeout` seconds"""
+    paths = _parse_fields(fields)
+    entry = None
+    async with aclosing(watch_report(report_id, timeout)) as updates:
+        async for entry in updates:
+            if since is None:
+                since = entry.status
+            if entry.status != since or entry.status in TERMINAL_STATUSES:
+                break
+    
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Report with ID '{report_id}' not found.")
+    
+    return _report_response(entry, request, paths)
+
+@router.websocket("/report/{report_id}/ws")
+async def report_updates(websocket: WebSocket, report_id: str):
+    """Push the report on connect and again on every status change until it is finished"""
+    await websocket.accept()
+    
+    async def push_updates() -> bool:
+        found = False
+        async with aclosing(watch_report(report_id, timeout=REPORT_WS_MAX_LIFETIME)) as updates:
+            async for entry in updates:
+                found = True
+                await websocket.send_text(entry.body.decode("utf-8"))
+        return found
+    
+    async def wait_for_disconnect() -> None:
+        # Client messages are ignored; reading is how a closed connection is noticed
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    pusher = asyncio.create_task(push_updates())
+    listener = asyncio.create_task(wait_for_disconnect())
+    try:
+        await asyncio.wait((pusher, listener), return_when=asyncio.FIRST_COMPLETED)
+        if not pusher.done():
+            return
+        if not pusher.result():
+            await websocket.send_json({
+                "ok": False,
+                "error": {"code": "report_not_found", "message": f"Report with ID '{report_id}' not found."}
+            })
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Not awaited: the handler may itself be cancelled here, and both tasks end on cancellation
+        for task in (pusher, listener):
+            task.cancel()
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    return [item.strip() for item in value.split(",") if item.strip()] if value is not None else None
+
+def _summary_filters(
+    status: Optional[str],
+    competition_level: Optional[str],
+    created_after: Optional[datetime],
+    created_before: Optional[datetime],
+    min_score: Optional[float],
+    max_score: Optional[float],
+) -> dict:
+    return {
+        "statuses": _split(status),
+        "competition_levels": _split(competition_level),
+        "created_after": created_after.timestamp() if created_after else None,
+        "created_before": created_before.timestamp() if created_before else None,
+        "min_score": min_score,
+        "max_score": max_score,
+    }
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if fields is None:
+        return None
     try:
-        report_data = get_report(report_id)
-    except Exception as e:
-        raise ReportError(f"Failed to retrieve report {report_id}: {str(e)}")
+        return parse_fields(fields) or None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _report_response(entry: CachedReport, request: Request, paths: Optional[Tuple[str, ...]] = None) -> Response:
+    if paths is not None:
+        entry = project_entry(entry, paths)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+@router.post("/report/{report_id}/sections/{section}/regenerate")
+async def regenerate_section(report_id: str, section: str):
+    """Regenerate one section of a completed report"""
+    if section not in SECTION_FIELDS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown section '{section}'. Valid sections: {', '.join(SECTION_FIELDS)}.",
+        )
     
+    report_data = await get_report(report_id)
     if report_data is None:
         raise HTTPException(status_code=404, detail=f"Report with ID '{report_id}' not found.")
+    if report_data.get("status") != "completed":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Report '{report_id}' is {report_data.get('status')}; only completed reports can be regenerated.",
+        )
     
-    return report_data
+    data = await regenerate_report_section(report_id, report_data, section)
+    return {"report_id": report_id, "section": section, "data": data}
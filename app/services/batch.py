@@ -0,0 +1,117 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from ..exceptions import QueueFullError
+from ..models.models import StartupIdea
+from ..reports import save_report, get_report
+from ..reports.cache import TERMINAL_STATUSES
+from .jobqueue import check_analysis_capacity, submit_analysis
+
+logger = logging.getLogger(__name__)
+
+# Batch configuration
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(5 * 1024 * 1024)))
+
+BATCH_FIELDS = ("idea", "customer", "problem", "solution", "background")
+
+# Stored status of batch manifests; no compaction TTL applies to it
+BATCH_MANIFEST_STATUS = "batch"
+
+def parse_batch_file(filename: str, content: bytes) -> List[Dict[str, Any]]:
+    """Parse a CSV (with a header row) or JSONL upload into raw records"""
+    text = content.decode("utf-8-sig")
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return [dict(row) for row in csv.DictReader(io.StringIO(text))]
+    if name.endswith(".jsonl") or name.endswith(".ndjson"):
+        rows = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}")
+        return rows
+    raise ValueError("Only .csv and .jsonl batch files are supported")
+
+def validate_batch_rows(rows: List[Any]) -> Tuple[List[StartupIdea], List[dict]]:
+    """Validate every record up front, returning the ideas and per-row errors"""
+    ideas, errors = [], []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"row": index, "errors": ["Record must be an object"]})
+            continue
+        try:
+            ideas.append(StartupIdea(**{field: row.get(field) for field in BATCH_FIELDS}))
+        except ValidationError as e:
+            errors.append({
+                "row": index,
+                "errors": [f"{'.'.join(str(loc) for loc in err['loc']) or 'record'}: {err['msg']}" for err in e.errors()],
+            })
+    return ideas, errors
+
+async def submit_batch(ideas: List[StartupIdea]) -> dict:
+    """Persist the batch manifest and item reports, and queue every item for analysis.
+
+    Items go through the configured job backend like single analyses, so they share its
+    concurrency and backpressure and, with the durable queue, survive restarts.
+    """
+    await check_analysis_capacity(len(ideas))
+    batch_id = str(uuid.uuid4())
+    queued_at = datetime.now().isoformat()
+    report_ids = [str(uuid.uuid4()) for _ in ideas]
+
+    for report_id in report_ids:
+        await save_report(report_id, {"status": "queued", "queued_at": queued_at, "batch_id": batch_id})
+    # The manifest is never updated; the batch status is derived from its items when read
+    await save_report(batch_id, {
+        "kind": "batch",
+        "status": BATCH_MANIFEST_STATUS,
+        "total": len(ideas),
+        "items": report_ids,
+        "queued_at": queued_at,
+    })
+
+    for index, (report_id, idea) in enumerate(zip(report_ids, ideas)):
+        try:
+            await submit_analysis(report_id, idea, queued_at)
+        except QueueFullError as e:
+            # Single analyses filled the queue since the capacity check
+            for rejected_id in report_ids[index:]:
+                await save_report(rejected_id, {"status": "failed", "error": e.message, "queued_at": queued_at, "batch_id": batch_id})
+            break
+    return {"batch_id": batch_id, "status": "processing", "total": len(ideas)}
+
+async def get_batch(batch_id: str) -> Optional[dict]:
+    """Return the batch manifest, or None if no batch has this ID"""
+    manifest = await get_report(batch_id)
+    if manifest is None or manifest.get("kind") != "batch":
+        return None
+    return manifest
+
+async def get_batch_items(manifest: dict) -> List[Tuple[int, str, Optional[dict]]]:
+    """Load every item report of a batch"""
+    reports = await asyncio.gather(*(get_report(report_id) for report_id in manifest["items"]))
+    return [(index, report_id, report) for index, (report_id, report) in enumerate(zip(manifest["items"], reports))]
+
+def batch_progress(items: List[Tuple[int, str, Optional[dict]]]) -> Tuple[str, Optional[str]]:
+    """Return the batch status and, once every item has finished, when the last one did"""
+    finished_at = []
+    for _, _, report in items:
+        if report is None:
+            # Expired or deleted; it will not change any more
+            continue
+        if report.get("status") not in TERMINAL_STATUSES:
+            return "processing", None
+        finished_at.append(report.get("completed_at") or report.get("failed_at") or "")
+    return "completed", max(finished_at, default=None) or None
+
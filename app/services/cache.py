@@ -0,0 +1,169 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from ..models.models import StartupIdea
+from ..metrics import ANALYSIS_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "86400"))
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", "")
+ANALYSIS_CACHE_DISK_MAX_MB = float(os.getenv("ANALYSIS_CACHE_DISK_MAX_MB", "256"))
+
+CACHE_KEY_FIELDS = ("idea", "customer", "problem", "solution", "background")
+
+def _normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).casefold()
+
+def make_cache_key(startup_data: StartupIdea, model: str, prompt_version: str) -> str:
+    """Stable content hash of the normalized submission, model and prompt version"""
+    payload = {field: _normalize(getattr(startup_data, field)) for field in CACHE_KEY_FIELDS}
+    payload["model"] = model
+    payload["prompt_version"] = prompt_version
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+class AnalysisCache:
+    """Two-tier (memory LRU + optional disk) cache of validated analysis results"""
+
+    def __init__(
+        self,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+        ttl: float = ANALYSIS_CACHE_TTL,
+        disk_dir: Optional[str] = ANALYSIS_CACHE_DIR or None,
+        disk_max_bytes: int = int(ANALYSIS_CACHE_DISK_MAX_MB * 1024 * 1024),
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached value, or None on a miss or expiry"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                self.hits += 1
+                ANALYSIS_CACHE_LOOKUPS.inc(result="hit")
+                return copy.deepcopy(value)
+            del self._memory[key]
+
+        if self.disk_dir is not None:
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None:
+                self._memory_set(key, *entry)
+                self.hits += 1
+                self.disk_hits += 1
+                ANALYSIS_CACHE_LOOKUPS.inc(result="disk_hit")
+                return copy.deepcopy(entry[1])
+
+        self.misses += 1
+        ANALYSIS_CACHE_LOOKUPS.inc(result="miss")
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a copy of value in both tiers"""
+        expires_at = time.time() + self.ttl
+        value = copy.deepcopy(value)
+        self._memory_set(key, expires_at, value)
+        if self.disk_dir is not None:
+            try:
+                await asyncio.to_thread(self._disk_set, key, expires_at, value)
+            except OSError as e:
+                logger.warning(f"Failed to write analysis cache entry {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _memory_set(self, key: str, expires_at: float, value: Dict[str, Any]) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return entry["expires_at"], entry["value"]
+
+    def _disk_set(self, key: str, expires_at: float, value: Dict[str, Any]) -> None:
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        encoded = json.dumps({"expires_at": expires_at, "value": value}, default=str)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(p.stat().st_size for p in self.disk_dir.glob("*/*.json"))
+        else:
+            self._disk_bytes += len(encoded)
+        if self._disk_bytes > self.disk_max_bytes:
+            self._disk_prune()
+
+    def _disk_prune(self) -> None:
+        """Drop expired entries, then the oldest ones until under the size budget"""
+        now = time.time()
+        files = []
+        for path in self.disk_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if stat.st_mtime + self.ttl <= now:
+                path.unlink(missing_ok=True)
+                self.evictions += 1
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        # Prune to 90% of the budget so we do not rescan on every write
+        target = self.disk_max_bytes * 0.9
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+        self._disk_bytes = total
+
+# Shared cache instance
+analysis_cache = AnalysisCache()
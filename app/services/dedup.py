@@ -0,0 +1,98 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from ..models.models import StartupIdea
+from .cache import make_cache_key
+
+# How long an Idempotency-Key maps to its report
+IDEMPOTENCY_KEY_TTL = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+# Identical submissions attach to the running analysis, and to its result for this many seconds after
+ANALYSIS_DEDUP_WINDOW = float(os.getenv("ANALYSIS_DEDUP_WINDOW", "30"))
+# Upper bound on attaching to a running analysis, for ones finished by a worker process this registry never hears about
+ANALYSIS_DEDUP_MAX_RUNNING = float(os.getenv("ANALYSIS_DEDUP_MAX_RUNNING", "3600"))
+
+class IdempotencyKeyReused(ValueError):
+    """An Idempotency-Key was sent again with a different payload"""
+
+def submission_fingerprint(startup_data: StartupIdea) -> str:
+    """Content hash of the normalized submission"""
+    return make_cache_key(startup_data, model="", prompt_version="")
+
+class SubmissionRegistry:
+    """Maps idempotency keys and payload fingerprints to report IDs.
+
+    Lookups and registration are synchronous, so on the event loop a check followed by a
+    register cannot interleave with another request: concurrent identical submissions
+    all receive the report ID of the first one and only one analysis runs.
+    """
+
+    def __init__(self, key_ttl: float = IDEMPOTENCY_KEY_TTL, max_keys: int = IDEMPOTENCY_MAX_KEYS, window: float = ANALYSIS_DEDUP_WINDOW, max_running: float = ANALYSIS_DEDUP_MAX_RUNNING):
+        self.key_ttl = key_ttl
+        self.max_keys = max_keys
+        self.window = window
+        self.max_running = max_running
+        # key -> (report_id, fingerprint, expires_at)
+        self._keys: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        # fingerprint -> (report_id, expires_at)
+        self._fingerprints: Dict[str, Tuple[str, float]] = {}
+        self._running: Dict[str, str] = {}
+        self.deduplicated = 0
+
+    def lookup(self, fingerprint: str, idempotency_key: Optional[str] = None) -> Optional[str]:
+        """Return the report ID to reuse for this submission, if any"""
+        now = time.monotonic()
+        if idempotency_key is not None:
+            entry = self._keys.get(idempotency_key)
+            if entry is not None and entry[2] > now:
+                if entry[1] != fingerprint:
+                    raise IdempotencyKeyReused(idempotency_key)
+                self.deduplicated += 1
+                return entry[0]
+
+        entry = self._fingerprints.get(fingerprint)
+        if entry is not None and entry[1] > now:
+            self.deduplicated += 1
+            if idempotency_key is not None:
+                self._remember_key(idempotency_key, entry[0], fingerprint, now)
+            return entry[0]
+        return None
+
+    def register(self, report_id: str, fingerprint: str, idempotency_key: Optional[str] = None) -> None:
+        """Record a newly submitted analysis as running"""
+        now = time.monotonic()
+        self._purge(now)
+        self._fingerprints[fingerprint] = (report_id, now + self.max_running)
+        self._running[report_id] = fingerprint
+        if idempotency_key is not None:
+            self._remember_key(idempotency_key, report_id, fingerprint, now)
+
+    def release(self, report_id: str, reusable: bool = True) -> None:
+        """Mark an analysis as finished; failed ones are not reused so a retry runs again"""
+        fingerprint = self._running.pop(report_id, None)
+        if fingerprint is None or self._fingerprints.get(fingerprint, (None,))[0] != report_id:
+            return
+        if reusable and self.window > 0:
+            self._fingerprints[fingerprint] = (report_id, time.monotonic() + self.window)
+        else:
+            del self._fingerprints[fingerprint]
+
+    def _remember_key(self, key: str, report_id: str, fingerprint: str, now: float) -> None:
+        self._keys[key] = (report_id, fingerprint, now + self.key_ttl)
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+
+    def _purge(self, now: float) -> None:
+        # Keys are kept in insertion order with a fixed TTL, so expired ones are at the front
+        while self._keys and next(iter(self._keys.values()))[2] <= now:
+            self._keys.popitem(last=False)
+        expired = [fp for fp, (_, expires_at) in self._fingerprints.items() if expires_at <= now]
+        for fingerprint in expired:
+            report_id, _ = self._fingerprints.pop(fingerprint)
+            if self._running.get(report_id) == fingerprint:
+                del self._running[report_id]
+
+# Shared registry for /analyze submissions
+submission_registry = SubmissionRegistry()
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Hedging configuration
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.9"))
+HEDGE_INITIAL_DELAY = float(os.getenv("HEDGE_INITIAL_DELAY", "45"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "5"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+
+class ModelSpec(NamedTuple):
+    name: str
+    timeout: float
+
+def parse_model_specs(value: str, default_timeout: float) -> List[ModelSpec]:
+    """Parse ``"model-a=90,model-b=60"`` into model specs; the timeout is optional"""
+    specs = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, timeout = item.partition("=")
+        specs.append(ModelSpec(name.strip(), float(timeout) if timeout else default_timeout))
+    if not specs:
+        raise ValueError(f"No models configured in {value!r}")
+    return specs
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per model"""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, model: str, latency: float) -> None:
+        self._samples.setdefault(model, deque(maxlen=self.window)).append(latency)
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        samples = self._samples.get(model)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def hedge_delay(self, model: str) -> float:
+        """How long to wait for ``model`` before sending a hedged request"""
+        samples = self._samples.get(model)
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_INITIAL_DELAY
+        return max(HEDGE_MIN_DELAY, self.percentile(model, HEDGE_PERCENTILE))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            model: {
+                "samples": len(samples),
+                "p50": self.percentile(model, 0.5),
+                "p90": self.percentile(model, 0.9),
+                "p99": self.percentile(model, 0.99),
+            }
+            for model, samples in self._samples.items()
+        }
+
+async def race_hedged(
+    specs: List[ModelSpec],
+    attempt: Callable[[ModelSpec], Awaitable[Any]],
+    tracker: LatencyTracker,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Run ``attempt`` against the models in order, hedging slow or failed calls.
+
+    The next model is started when the newest in-flight model passes its hedge
+    deadline or when every in-flight attempt has failed. The first attempt to
+    return (i.e. to produce a parsed response) wins and the others are cancelled.
+    Returns the result together with the winner and per-model latencies.
+    """
+    started = time.monotonic()
+    attempts: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[asyncio.Task, Tuple[ModelSpec, float]] = {}
+    remaining = list(specs)
+    last_error: Optional[BaseException] = None
+
+    def launch() -> ModelSpec:
+        spec = remaining.pop(0)
+        attempts[spec.name] = {"started_after": round(time.monotonic() - started, 3)}
+        task = asyncio.create_task(asyncio.wait_for(attempt(spec), timeout=spec.timeout))
+        tasks[task] = (spec, time.monotonic())
+        return spec
+
+    newest = launch()
+    try:
+        while tasks:
+            timeout = tracker.hedge_delay(newest.name) if remaining else None
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.info(f"Hedging: {newest.name} exceeded {timeout:.1f}s, starting {remaining[0].name}")
+                newest = launch()
+                continue
+
+            for task in done:
+                spec, task_started = tasks.pop(task)
+                latency = time.monotonic() - task_started
+                attempts[spec.name]["latency"] = round(latency, 3)
+                if task.exception() is None:
+                    attempts[spec.name]["status"] = "won"
+                    tracker.record(spec.name, latency)
+                    return task.result(), {
+                        "model": spec.name,
+                        "hedged": len(attempts) > 1,
+                        "latency": round(time.monotonic() - started, 3),
+                        "attempts": attempts,
+                    }
+                last_error = task.exception()
+                attempts[spec.name]["status"] = "failed"
+                attempts[spec.name]["error"] = str(last_error) or type(last_error).__name__
+
+            if not tasks and remaining:
+                newest = launch()
+        raise last_error
+    finally:
+        for task, (spec, task_started) in tasks.items():
+            task.cancel()
+            attempts[spec.name]["status"] = "cancelled"
+            attempts[spec.name]["latency"] = round(time.monotonic() - task_started, 3)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+# Shared latency statistics used to pick hedge deadlines
+latency_tracker = LatencyTracker()
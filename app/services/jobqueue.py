@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+from ..exceptions import QueueFullError
+from ..metrics import ANALYSES_QUEUED
+from ..models.models import StartupIdea
+from ..reports import REPORTS_DIR
+from .pipeline import run_analysis
+from .scheduler import ANALYSIS_RETRY_AFTER, scheduler
+
+# "local" runs analyses in the API process; "sqlite" enqueues them for `python -m app.worker`
+JOB_BACKEND = os.getenv("JOB_BACKEND", "local")
+JOB_QUEUE_PATH = Path(os.getenv("JOB_QUEUE_PATH", REPORTS_DIR / "jobs.db"))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "10000"))
+# A leased job is handed to another worker if its lease is not renewed within this many seconds
+JOB_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+# Jobs whose worker died this many times are given up on and their report marked failed
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, created_at);
+"""
+
+class LeasedJob(NamedTuple):
+    id: str
+    payload: dict
+    attempts: int
+
+class SQLiteJobQueue:
+    """Durable job queue shared by the API and any number of worker processes on a node.
+
+    Workers lease jobs for a visibility timeout and renew the lease while they work. A job
+    whose lease runs out (its worker crashed or was killed) becomes available again. Jobs
+    stay in the table until completed, so nothing is lost across restarts. Methods are
+    synchronous; async callers run them off the event loop.
+    """
+
+    def __init__(self, path: Path, visibility_timeout: float = JOB_VISIBILITY_TIMEOUT):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.visibility_timeout = visibility_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode, so lease() can take the write lock up front with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def enqueue(self, job_id: str, payload: dict) -> None:
+        self._connection().execute(
+            "INSERT INTO jobs (id, payload, state, created_at) VALUES (?, ?, 'ready', ?)",
+            (job_id, json.dumps(payload), time.time()),
+        )
+
+    def depth(self) -> int:
+        """Jobs waiting for a worker, including ones whose lease expired"""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE state = 'ready' OR (state = 'leased' AND lease_expires < ?)",
+            (time.time(),),
+        ).fetchone()[0]
+
+    def lease(self, owner: str) -> Optional[LeasedJob]:
+        """Take the oldest available job, or reclaim one whose lease expired"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT id, payload, attempts FROM jobs
+                WHERE state = 'ready' OR (state = 'leased' AND lease_expires < ?)
+                ORDER BY created_at LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET state = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                    (owner, now + self.visibility_timeout, row[0]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return LeasedJob(row[0], json.loads(row[1]), row[2] + 1)
+
+    def renew(self, job_id: str, owner: str) -> bool:
+        """Extend a lease; False if the job was reclaimed by another worker meanwhile"""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+            (time.time() + self.visibility_timeout, job_id, owner),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, owner: str) -> None:
+        self._connection().execute("DELETE FROM jobs WHERE id = ? AND lease_owner = ?", (job_id, owner))
+
+    def release(self, job_id: str, owner: str) -> None:
+        """Hand a leased job back without counting the attempt, e.g. on graceful shutdown"""
+        self._connection().execute(
+            "UPDATE jobs SET state = 'ready', lease_owner = NULL, lease_expires = NULL, attempts = attempts - 1 "
+            "WHERE id = ? AND lease_owner = ?",
+            (job_id, owner),
+        )
+
+    def bury(self, job_id: str, owner: str, error: str) -> None:
+        """Park a job that keeps killing its workers"""
+        self._connection().execute(
+            "UPDATE jobs SET state = 'dead', last_error = ? WHERE id = ? AND lease_owner = ?",
+            (error, job_id, owner),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+_job_queue: Optional[SQLiteJobQueue] = None
+
+def get_job_queue() -> SQLiteJobQueue:
+    """Return the shared durable queue, opening it on first use"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = SQLiteJobQueue(JOB_QUEUE_PATH)
+    return _job_queue
+
+def close_job_queue() -> None:
+    global _job_queue
+    if _job_queue is not None:
+        _job_queue.close()
+        _job_queue = None
+
+def analysis_queue_capacity() -> int:
+    """Most analyses the configured queue can hold at once"""
+    return JOB_QUEUE_MAX_DEPTH if JOB_BACKEND == "sqlite" else scheduler.max_queue_size
+
+async def check_analysis_capacity(count: int = 1) -> None:
+    """Raise QueueFullError if ``count`` new analyses would not fit in the configured queue"""
+    if JOB_BACKEND != "sqlite":
+        scheduler.check_capacity(count)
+        return
+    depth = await asyncio.to_thread(get_job_queue().depth)
+    if depth + count > JOB_QUEUE_MAX_DEPTH:
+        raise QueueFullError("The analysis queue is full. Please retry later.", retry_after=ANALYSIS_RETRY_AFTER)
+
+async def submit_analysis(report_id: str, startup_data: StartupIdea, queued_at: str) -> None:
+    """Run the analysis in this process or hand it to the worker processes"""
+    if JOB_BACKEND != "sqlite":
+        scheduler.submit(report_id, run_analysis, report_id, startup_data, queued_at)
+        return
+    payload = {"startup_data": startup_data.model_dump(mode="json"), "queued_at": queued_at}
+    await asyncio.to_thread(get_job_queue().enqueue, report_id, payload)
+
+if JOB_BACKEND == "sqlite":
+    ANALYSES_QUEUED.set_function(lambda: get_job_queue().depth())
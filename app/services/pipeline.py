@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator
+from ..models.models import StartupIdea, ValidationReport
+from ..reports import save_report
+from ..exceptions import AIAnalysisError
+from ..metrics import ANALYSES_TOTAL
+from .service import AIAnalysisService
+from .prompts import SECTION_FIELDS
+from .dedup import submission_registry
+
+logger = logging.getLogger(__name__)
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+async def run_analysis(report_id: str, startup_data: StartupIdea, queued_at: str) -> None:
+    """Run a queued analysis job and move its report through processing to completed/failed"""
+    timestamps = {"queued_at": queued_at, "started_at": _now()}
+    await save_report(report_id, {"status": "processing", "progress": "AI analysis in progress...", **timestamps})
+
+    try:
+        ai_service = AIAnalysisService()
+        analysis_result = await ai_service.analyze_startup(startup_data)
+
+        if analysis_result.get("type") == "clarification_request":
+            clarification_data = {
+                "status": "clarification_needed",
+                "message": analysis_result.get("message", "The AI requires more information to proceed."),
+                **timestamps,
+                "completed_at": _now(),
+            }
+            await save_report(report_id, clarification_data)
+            ANALYSES_TOTAL.inc(outcome="clarification_needed", mode="queued")
+            return
+
+        if analysis_result.get("type") == "analysis":
+            report = build_report(report_id, startup_data, analysis_result["data"])
+            report_data = {
+                "status": "completed",
+                "analysis": report,
+                "generation": analysis_result.get("generation"),
+                **timestamps,
+                "completed_at": _now(),
+            }
+            await save_report(report_id, report_data)
+            ANALYSES_TOTAL.inc(outcome="completed", mode="queued")
+            return
+
+        # If the AI service returns a valid but unexpected response type
+        raise AIAnalysisError(f"Unexpected response type from AI service: {analysis_result.get('type')}")
+
+    except Exception as e:
+        logger.error(f"Analysis for report {report_id} failed: {e}")
+        ANALYSES_TOTAL.inc(outcome="failed", mode="queued")
+        error_data = {"status": "failed", "error": str(e), **timestamps, "failed_at": _now()}
+        submission_registry.release(report_id, reusable=False)
+        await save_report(report_id, error_data)
+    finally:
+        submission_registry.release(report_id)
+
+def build_report(report_id: str, startup_data: StartupIdea, data: dict) -> ValidationReport:
+    """Build a ValidationReport from the validated analysis data"""
+    return ValidationReport(
+        id=report_id,
+        startup_data=startup_data,
+        viability_score=data["viability_score"],
+        market_size=data["market_size"],
+        competition_level=data["competition_level"],
+        time_to_market=data["time_to_market"],
+        market_analysis=data["market_analysis"],
+        risk_assessment=data["risk_assessment"],
+        recommendations=data["recommendations"],
+        financial_projections=data["financial_projections"],
+        action_plan=data["action_plan"],
+        competitive_landscape=data["competitive_landscape"],
+        founder_market_fit=data["founder_market_fit"],
+        yc_criteria_assessment=data["yc_criteria_assessment"],
+        created_at=datetime.now()
+    )
+
+async def regenerate_report_section(report_id: str, report_data: dict, section: str) -> dict:
+    """Regenerate one section of a completed report, save the report and return the section"""
+    analysis = report_data["analysis"]
+    # The submission was validated when the report was created
+    startup_data = StartupIdea.model_construct(**{
+        field: analysis["startup_data"].get(field)
+        for field in ("idea", "customer", "problem", "solution", "background")
+    })
+
+    ai_service = AIAnalysisService()
+    result = await ai_service.regenerate_section(startup_data, section)
+
+    merged = {key: analysis.get(key) for keys in SECTION_FIELDS.values() for key in keys}
+    merged.update(result["data"])
+    validated = ai_service._validate_analysis_structure({"type": "analysis", "data": merged})["data"]
+    for key in SECTION_FIELDS[section]:
+        analysis[key] = validated[key]
+
+    regenerated = report_data.setdefault("regenerated_sections", {})
+    regenerated[section] = {"at": _now(), "generation": result["generation"]}
+    await save_report(report_id, report_data)
+    return {key: analysis[key] for key in SECTION_FIELDS[section]}
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def stream_analysis_events(report_id: str, startup_data: StartupIdea, queued_at: str) -> AsyncIterator[str]:
+    """Run a streaming analysis, yielding server-sent events and persisting partial sections"""
+    timestamps = {"queued_at": queued_at, "started_at": _now()}
+    partial = {}
+
+    try:
+        await save_report(report_id, {"status": "processing", "progress": "AI analysis in progress...", "partial": partial, **timestamps})
+        yield _sse("report", {"report_id": report_id, "status": "processing"})
+
+        ai_service = AIAnalysisService()
+        analysis_result = None
+        async for kind, name, value in ai_service.stream_analysis(startup_data):
+            if kind == "section":
+                partial[name] = value
+                await save_report(report_id, {"status": "processing", "progress": "AI analysis in progress...", "partial": partial, **timestamps})
+                yield _sse("section", {"name": name, "data": value})
+            else:
+                analysis_result = value
+
+        if analysis_result.get("type") == "clarification_request":
+            clarification_data = {
+                "status": "clarification_needed",
+                "message": analysis_result.get("message", "The AI requires more information to proceed."),
+                **timestamps,
+                "completed_at": _now(),
+            }
+            await save_report(report_id, clarification_data)
+            ANALYSES_TOTAL.inc(outcome="clarification_needed", mode="stream")
+            yield _sse("clarification", {"report_id": report_id, "status": "clarification_needed", "message": clarification_data["message"]})
+            return
+
+        if analysis_result.get("type") == "analysis":
+            report = build_report(report_id, startup_data, analysis_result["data"])
+            report_data = {
+                "status": "completed",
+                "analysis": report,
+                "generation": analysis_result.get("generation"),
+                **timestamps,
+                "completed_at": _now(),
+            }
+            await save_report(report_id, report_data)
+            ANALYSES_TOTAL.inc(outcome="completed", mode="stream")
+            yield _sse("complete", {"report_id": report_id, "status": "completed"})
+            return
+
+        raise AIAnalysisError(f"Unexpected response type from AI service: {analysis_result.get('type')}")
+
+    except Exception as e:
+        logger.error(f"Streaming analysis for report {report_id} failed: {e}")
+        ANALYSES_TOTAL.inc(outcome="failed", mode="stream")
+        await save_report(report_id, {"status": "failed", "error": str(e), **timestamps, "failed_at": _now()})
+        yield _sse("error", {"report_id": report_id, "status": "failed", "error": str(e)})
+    except BaseException:
+        # The client disconnected, which cancels or closes this generator and the analysis with it.
+        # Shielded, as the disconnect cancels every await made here.
+        logger.warning(f"Streaming analysis for report {report_id} was abandoned by the client")
+        ANALYSES_TOTAL.inc(outcome="disconnected", mode="stream")
+        await asyncio.shield(save_report(report_id, {
+            "status": "failed",
+            "error": "The client disconnected before the analysis finished",
+            **timestamps,
+            "failed_at": _now(),
+        }))
+        raise
@@ -0,0 +1,320 @@
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+from ..models.models import StartupIdea
+
+# Bump whenever the prompt changes so cached analyses are not reused across versions
+PROMPT_VERSION = "2"
+
+# Per-field input token budgets, overridable as "field=tokens,..."
+DEFAULT_FIELD_BUDGETS = {
+    "idea": 300,
+    "customer": 150,
+    "problem": 300,
+    "solution": 300,
+    "background": 1200,
+}
+PROMPT_FIELD_BUDGETS = {
+    **DEFAULT_FIELD_BUDGETS,
+    **{
+        name.strip(): int(value)
+        for name, _, value in (item.partition("=") for item in os.getenv("PROMPT_FIELD_BUDGETS", "").split(",") if "=" in item)
+    },
+}
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    # Loaded on first use; building the encoding is slow and tiktoken is optional
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:  # optional dependency; fall back to an estimate
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when installed, otherwise estimate ~4 characters per token"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+@lru_cache(maxsize=None)
+def static_prompt_tokens(prompt: str) -> int:
+    """Token count of a static system prompt, computed once"""
+    return count_tokens(prompt)
+
+PERSONA = """You are a senior indian startup analyst and venture capitalist with 20+ years of experience. Your analysis is brutally honest, data-driven, and avoids fluff. You are a world-class expert in evaluating new business ideas.
+You will be given a startup idea submission and you must return your analysis ONLY in the requested JSON format."""
+
+# JSON template lines for each analysis field, in report order
+FIELD_TEMPLATES = {
+    "viability_score": """        "viability_score": 0.0 // A score from 0.0 to 10.0 representing overall potential.""",
+    "market_size": """        "market_size": "" // Estimated market size (e.g., "$10B+").""",
+    "competition_level": """        "competition_level": "Low/Medium/High" // Overall competition level.""",
+    "time_to_market": """        "time_to_market": "" // Estimated time to launch an MVP (e.g., "3-6 months").""",
+    "market_analysis": """        "market_analysis": {
+            "tam": "", // Total Addressable Market analysis and estimated value.
+            "sam": "", // Serviceable Addressable Market analysis and estimated value.
+            "som": "", // Serviceable Obtainable Market analysis and estimated value.
+            "growth_rate": "", // Estimated market growth rate (e.g., "15% CAGR").
+            "key_trends": [] // List of 3-5 key market trends.
+        }""",
+    "competitive_landscape": """        "competitive_landscape": {
+            "direct_competitors": [ // List of 2-3 main direct competitors.
+                {"name": "", "market_share": "", "weakness": ""}
+            ],
+            "competitive_advantage": "", // What is this idea's unique advantage?
+            "market_gap": "" // What specific market gap does this idea fill?
+        }""",
+    "risk_assessment": """        "risk_assessment": {
+            "high_risks": [], // List of 2-3 high-impact risks.
+            "medium_risks": [], // List of 2-3 medium-impact risks.
+            "low_risks": [] // List of 2-3 low-impact risks.
+        }""",
+    "founder_market_fit": """        "founder_market_fit": {
+            "score": 0.0, // A score from 0.0 to 10.0.
+            "strengths": [], // List of the founder's key strengths for this venture.
+            "gaps": [], // List of critical gaps in the founder's experience or skills.
+            "recommendations": [] // Actionable recommendations to improve founder-market fit.
+        }""",
+    "yc_criteria_assessment": """        "yc_criteria_assessment": {
+            "problem_clarity": 0, // Score 0-10 for how well the problem is defined.
+            "solution_fit": 0, // Score 0-10 for how well the solution fits the problem.
+            "market_size": 0, // Score 0-10 for the market potential.
+            "founder_strength": 0, // Score 0-10 for the founder's suitability.
+            "traction_potential": 0, // Score 0-10 for the potential to gain early traction.
+            "overall_score": 0.0, // The average of the scores above.
+            "notes": "" // Your summary notes on the YC assessment.
+        }""",
+    "recommendations": """        "recommendations": {
+            "mvp_strategy": "", // A concise, actionable MVP strategy.
+            "funding_needs": "", // Initial funding requirements (e.g., "$25k for MVP", "Bootstrapped").
+            "key_partnerships": [], // List of potential key partners.
+            "success_metrics": [] // List of 2-3 key metrics to track for success.
+        }""",
+    "financial_projections": """        "financial_projections": {
+            "revenue_model": "", // e.g., "SaaS Subscription", "Commission-based".
+            "avg_booking_value": "", // Estimated average value of a transaction.
+            "monthly_bookings_y1": "", // Projected bookings in month 12.
+            "projected_mrr_y1": "", // Projected MRR at the end of year 1.
+            "customer_acquisition_cost": "", // Estimated CAC.
+            "customer_lifetime_value": "", // Estimated LTV.
+            "break_even_timeline": "", // Estimated time to break even.
+            "funding_requirements": [
+                {"stage": "Pre-Seed/Seed", "amount": "", "use": ""}
+            ]
+        }""",
+    "action_plan": """        "action_plan": {
+            "phase_1": {
+                "timeline": "0-3 months",
+                "title": "Validation & Planning",
+                "tasks": [] // List of tasks for this phase.
+            },
+            "phase_2": {
+                "timeline": "3-6 months",
+                "title": "Development & Alpha Testing",
+                "tasks": [] // List of tasks for this phase.
+            },
+            "phase_3": {
+                "timeline": "6-12 months",
+                "title": "Launch & Growth",
+                "tasks": [] // List of tasks for this phase.
+            }
+        }""",
+}
+
+SECTION_FIELDS = {
+    "overview": ("viability_score", "market_size", "competition_level", "time_to_market"),
+    "market_analysis": ("market_analysis",),
+    "competitive_landscape": ("competitive_landscape",),
+    "risk_assessment": ("risk_assessment",),
+    "founder_market_fit": ("founder_market_fit",),
+    "yc_criteria_assessment": ("yc_criteria_assessment",),
+    "recommendations": ("recommendations",),
+    "financial_projections": ("financial_projections",),
+    "action_plan": ("action_plan",),
+}
+
+def _join_fields(snippets: List[str]) -> str:
+    # Every field but the last needs a comma, placed before any trailing // comment
+    joined = []
+    for i, snippet in enumerate(snippets):
+        if i < len(snippets) - 1:
+            head, sep, comment = snippet.rpartition(" //")
+            if sep and "\n" not in comment:
+                snippet = f"{head},{sep}{comment}"
+            else:
+                snippet += ","
+        joined.append(snippet)
+    return "\n".join(joined)
+
+def analysis_template(fields) -> str:
+    """JSON template covering the given analysis fields"""
+    body = _join_fields([FIELD_TEMPLATES[name] for name in fields])
+    return "```json\n{\n    \"type\": \"analysis\",\n    \"data\": {\n" + body + "\n    }\n}\n```"
+
+INSTRUCTIONS = """## INSTRUCTIONS
+
+Your task is to evaluate the submission provided in the user message inside <submission> tags based on the following two-step process:
+
+**Step 1: Evaluate Input**
+First, assess the provided submission. 
+- If the input is valid and provides significant idea that makes sense and is not just random words put together, proceed to Step 2.
+- If the input is too short, vague, contains placeholder text (e.g., "test", "asdf"), or is otherwise nonsensical, **DO NOT** perform the analysis. Instead, you MUST respond with the following JSON object:
+
+```json
+{
+    "type": "clarification_request",
+    "message": "<Your user-friendly message asking for more specific and meaningful input. Explain what is missing or unclear and guide the user on how to improve their submission.>"
+}
+```
+- Do not ask user for competitor analysis, market size, growth rate or such matrices from user as you are responsible to provide that in your validation research.
+
+**Step 2: Perform In-Depth Validation Analysis**
+If the input quality is sufficient, you MUST provide a detailed, actionable, and brutally honest startup validation analysis focused for indian startup ecosystem unless specified otherwise in target audience. Your entire response must be a single JSON object, using the exact structure and keys shown in the template below. Fill in the values based on your expert analysis.
+
+**JSON ANALYSIS TEMPLATE (FILL THIS OUT):**"""
+
+REMINDER = """Remember: Your final output must be **ONLY** the single, valid JSON object specified in the templates above. Do not include any other text, explanations, or formatting."""
+
+SECTION_INSTRUCTIONS = """## INSTRUCTIONS
+
+You are one of several analysts, each writing one part of a startup validation report. Evaluate the submission provided in the user message inside <submission> tags and write ONLY the part of the report shown in the template below. Provide a detailed, actionable, and brutally honest analysis focused for indian startup ecosystem unless specified otherwise in target audience.
+- Do not ask user for competitor analysis, market size, growth rate or such matrices from user as you are responsible to provide that in your validation research.
+
+**JSON TEMPLATE (FILL THIS OUT):**
+"""
+
+# Static prefix shared by every request; placed first so provider-side prompt caching can hit
+SYSTEM_PROMPT = PERSONA + "\n\n" + INSTRUCTIONS + "\n" + analysis_template(FIELD_TEMPLATES) + "\n\n" + REMINDER + "\n"
+
+# One static system prompt per section for sectioned analysis. The overview section
+# keeps the input evaluation step, so it is the one that can ask for clarification.
+SECTION_PROMPTS = {
+    name: PERSONA + "\n\n" + (INSTRUCTIONS if name == "overview" else SECTION_INSTRUCTIONS) + "\n"
+    + analysis_template(fields) + "\n\n" + REMINDER + "\n"
+    for name, fields in SECTION_FIELDS.items()
+}
+
+_NOISE_LINE = re.compile(r"^\s*(page\s*\d+(\s*of\s*\d+)?|\d+|[-–—_•·|]+)\s*$", re.IGNORECASE)
+
+class BuiltPrompt(NamedTuple):
+    messages: List[dict]
+    input_tokens: int
+    truncated_fields: List[str]
+
+def _truncate_words(text: str, budget: int) -> str:
+    """Cut text to roughly ``budget`` tokens at a word boundary"""
+    words = text.split()
+    low, high = 0, len(words)
+    # Binary search for the longest word prefix that fits the budget
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:mid])) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low]) + " [...]"
+
+def condense_resume(text: str, budget: int) -> str:
+    """Fit resume text into ``budget`` tokens.
+
+    Drops blank, page-number and decoration lines and exact duplicate lines (repeated
+    headers and footers), then keeps the start of the resume, where summaries and recent
+    roles usually are, plus a shorter tail with education and skills.
+    """
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line or _NOISE_LINE.match(line) or line.casefold() in seen:
+            continue
+        seen.add(line.casefold())
+        lines.append(line)
+    cleaned = "\n".join(lines)
+    if count_tokens(cleaned) <= budget:
+        return cleaned
+
+    head_budget = int(budget * 0.7)
+    tail_budget = budget - head_budget
+    head, tail = [], []
+    used = 0
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > head_budget:
+            break
+        head.append(line)
+        used += cost
+    used = 0
+    for line in reversed(lines[len(head):]):
+        cost = count_tokens(line) + 1
+        if used + cost > tail_budget:
+            break
+        tail.append(line)
+        used += cost
+    if not head:
+        return _truncate_words(cleaned, budget)
+    return "\n".join(head + ["[...]"] + list(reversed(tail)))
+
+class PromptBuilder:
+    """Builds analysis prompts as a static system prefix plus a budgeted submission"""
+
+    version = PROMPT_VERSION
+
+    def __init__(self, field_budgets: Dict[str, int] = PROMPT_FIELD_BUDGETS):
+        self.field_budgets = field_budgets
+
+    def fit_field(self, name: str, value: str) -> Tuple[str, bool]:
+        """Return the field value fitted to its token budget and whether it was shortened"""
+        value = (value or "").strip()
+        budget = self.field_budgets.get(name)
+        if budget is None or count_tokens(value) <= budget:
+            return value, False
+        if name == "background":
+            return condense_resume(value, budget), True
+        return _truncate_words(value, budget), True
+
+    def build_submission(self, data: StartupIdea) -> Tuple[str, List[str]]:
+        fields = {}
+        truncated = []
+        for name in ("idea", "customer", "problem", "solution", "background"):
+            fields[name], was_truncated = self.fit_field(name, getattr(data, name))
+            if was_truncated:
+                truncated.append(name)
+        submission = f"""Here is the startup idea submission I need you to analyze:
+
+<submission>
+**Startup Idea:** {fields["idea"]}
+**Target Customer:** {fields["customer"]}
+**Problem:** {fields["problem"]}
+**Solution:** {fields["solution"]}
+**Founder Background:** {fields["background"]}
+</submission>"""
+        return submission, truncated
+
+    def build(self, data: StartupIdea) -> BuiltPrompt:
+        submission, truncated = self.build_submission(data)
+        return BuiltPrompt(
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": submission},
+            ],
+            input_tokens=static_prompt_tokens(SYSTEM_PROMPT) + count_tokens(submission),
+            truncated_fields=truncated,
+        )
+
+    def build_section(self, data: StartupIdea, section: str) -> BuiltPrompt:
+        """Build the prompt for one section of a sectioned analysis"""
+        submission, truncated = self.build_submission(data)
+        return BuiltPrompt(
+            messages=[
+                {"role": "system", "content": SECTION_PROMPTS[section]},
+                {"role": "user", "content": submission},
+            ],
+            input_tokens=static_prompt_tokens(SECTION_PROMPTS[section]) + count_tokens(submission),
+            truncated_fields=truncated,
+        )
+
+# Shared prompt builder
+prompt_builder = PromptBuilder()
@@ -0,0 +1,280 @@
+import asyncio
+import email.utils
+import logging
+import math
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Optional, Tuple, TypeVar
+from ..exceptions import AIServiceUnavailableError
+
+if TYPE_CHECKING:
+    from openai import APIStatusError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Resilience configuration for calls to the LLM provider
+LLM_RATE_LIMIT = float(os.getenv("LLM_RATE_LIMIT", "5"))
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", "10"))
+LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", "32"))
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+class TokenBucket:
+    """Token-bucket rate limiter: ``rate`` tokens per second with bursts up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Waiters queue on the lock so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit.
+
+    The limit grows by roughly one slot per round of successful calls and is cut
+    multiplicatively when the provider throttles us or latency exceeds the target.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        backoff: float = 0.5,
+        decrease_interval: float = 1.0,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.decrease_interval = decrease_interval
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def __aenter__(self) -> "AdaptiveConcurrencyLimiter":
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        if latency > self.latency_target:
+            self.on_overload()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_overload(self) -> None:
+        # Several in-flight calls usually see the same overload; cut once per interval
+        now = time.monotonic()
+        if now - self._last_decrease >= self.decrease_interval:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._last_decrease = now
+
+class CircuitBreaker:
+    """Fails fast after repeated provider failures, probing again after ``reset_timeout``"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        if self.state == "open":
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                raise AIServiceUnavailableError(
+                    "The AI service is temporarily unavailable. Please retry later.",
+                    retry_after=math.ceil(remaining),
+                )
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self.state == "half_open":
+            # Only one probe call is let through while half open
+            if self._probe_in_flight:
+                raise AIServiceUnavailableError(
+                    "The AI service is temporarily unavailable. Please retry later.",
+                    retry_after=math.ceil(self.reset_timeout),
+                )
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Let another call probe; for a probe abandoned before it reached the provider"""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("Circuit breaker opened for the AI provider")
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+def _retry_after_seconds(error: "APIStatusError") -> Optional[float]:
+    headers = error.response.headers
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+def classify_error(error: Exception) -> Tuple[bool, bool, Optional[float]]:
+    """Return (retryable, overload, retry_after) for an exception raised by the provider call"""
+    from openai import APIConnectionError, APIStatusError, RateLimitError
+
+    if isinstance(error, RateLimitError):
+        return True, True, _retry_after_seconds(error)
+    if isinstance(error, APIStatusError):
+        if error.status_code >= 500 or error.status_code == 408:
+            return True, error.status_code in (502, 503, 504), _retry_after_seconds(error)
+        return False, False, None
+    if isinstance(error, APIConnectionError):
+        return True, False, None
+    return False, False, None
+
+class ResilientCaller:
+    """Wraps provider calls with rate limiting, adaptive concurrency, retries and a circuit breaker"""
+
+    def __init__(
+        self,
+        rate_limiter: TokenBucket,
+        limiter: AdaptiveConcurrencyLimiter,
+        breaker: CircuitBreaker,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = LLM_RETRY_BASE_DELAY,
+        max_delay: float = LLM_RETRY_MAX_DELAY,
+    ):
+        self.rate_limiter = rate_limiter
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        async with self.hold(func) as result:
+            return result
+
+    @asynccontextmanager
+    async def hold(self, func: Callable[[], Awaitable[T]]) -> AsyncIterator[T]:
+        """Make the call like ``call`` but keep its concurrency slot until the block exits.
+
+        Used for streamed responses, so the limiter sees the whole response rather than
+        the time to the first byte. Errors raised by the block are not retried.
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                await self.rate_limiter.acquire()
+                async with self.limiter:
+                    started = time.monotonic()
+                    try:
+                        result = await func()
+                    except asyncio.CancelledError:
+                        # A caller's timeout or a losing hedge: the provider did not answer in time
+                        self.breaker.record_failure()
+                        raise
+                    except Exception as e:
+                        error = e
+                        retryable, overload, retry_after = classify_error(e)
+                        if not retryable:
+                            # The provider answered; the failure is about this request only
+                            self.breaker.record_success()
+                            raise
+                        self.breaker.record_failure()
+                        if overload:
+                            self.limiter.on_overload()
+                    else:
+                        self.breaker.record_success()
+                        try:
+                            yield result
+                        except Exception as e:
+                            # A stream broken off by the provider
+                            retryable, overload, _ = classify_error(e)
+                            if retryable:
+                                self.breaker.record_failure()
+                            if overload:
+                                self.limiter.on_overload()
+                            raise
+                        self.limiter.on_success(time.monotonic() - started)
+                        return
+            except asyncio.CancelledError:
+                # Cancelled while waiting for a token or a slot; never leave a half-open probe claimed
+                self.breaker.release_probe()
+                raise
+
+            attempt += 1
+            if attempt > self.max_retries:
+                raise error
+            # Full-jitter exponential backoff unless the provider told us how long to wait
+            delay = retry_after if retry_after is not None else random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+            if delay > self.max_delay:
+                raise error
+            logger.info(f"Retrying AI provider call in {delay:.2f}s (attempt {attempt}/{self.max_retries}): {error}")
+            await asyncio.sleep(delay)
+
+# Shared resilience layer for all provider calls
+resilient_caller = ResilientCaller(
+    TokenBucket(LLM_RATE_LIMIT, LLM_RATE_BURST),
+    AdaptiveConcurrencyLimiter(LLM_CONCURRENCY_INITIAL, LLM_CONCURRENCY_MIN, LLM_CONCURRENCY_MAX, LLM_LATENCY_TARGET),
+    CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET),
+)
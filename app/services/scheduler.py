@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+from ..exceptions import QueueFullError
+from ..metrics import ANALYSES_IN_FLIGHT, ANALYSES_QUEUED
+
+logger = logging.getLogger(__name__)
+
+# Scheduler configuration
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", "200"))
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "8"))
+ANALYSIS_RETRY_AFTER = int(os.getenv("ANALYSIS_RETRY_AFTER", "30"))
+
+class JobScheduler:
+    """In-process job queue drained by a fixed number of concurrent worker slots"""
+
+    def __init__(self, max_queue_size: int = ANALYSIS_QUEUE_SIZE, concurrency: int = ANALYSIS_CONCURRENCY):
+        self.max_queue_size = max_queue_size
+        self.concurrency = concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._in_flight = 0
+        self._avg_duration: Optional[float] = None
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def start(self) -> None:
+        """Create the queue and spawn the worker tasks"""
+        self._spawn_workers()
+
+    def _spawn_workers(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"analysis-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks; queued jobs that never started are dropped"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def check_capacity(self, count: int = 1) -> None:
+        """Raise QueueFullError if ``count`` new jobs would not fit in the queue"""
+        if self.queued + count > self.max_queue_size:
+            raise QueueFullError(
+                "The analysis queue is full. Please retry later.",
+                retry_after=self.retry_after(),
+            )
+
+    def submit(self, job_id: str, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """Enqueue a job or raise QueueFullError when the queue is saturated"""
+        # Allow use outside the lifespan (e.g. scripts); we are inside a running loop here
+        self._spawn_workers()
+        try:
+            self._queue.put_nowait((job_id, func, args))
+        except asyncio.QueueFull:
+            raise QueueFullError(
+                "The analysis queue is full. Please retry later.",
+                retry_after=self.retry_after(),
+            )
+
+    def retry_after(self) -> int:
+        """Estimate how many seconds until a queue slot frees up"""
+        if self._avg_duration is None:
+            return ANALYSIS_RETRY_AFTER
+        return max(1, math.ceil(self._avg_duration * self.queued / max(self.concurrency, 1)))
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, func, args = await self._queue.get()
+            self._in_flight += 1
+            started = time.monotonic()
+            try:
+                await func(*args)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Job {job_id} failed")
+            finally:
+                self._in_flight -= 1
+                duration = time.monotonic() - started
+                # Exponential moving average used for Retry-After estimates
+                self._avg_duration = duration if self._avg_duration is None else 0.8 * self._avg_duration + 0.2 * duration
+                self._queue.task_done()
+
+# Shared scheduler, started and stopped by the application lifespan
+scheduler = JobScheduler()
+ANALYSES_QUEUED.set_function(lambda: scheduler.queued)
+ANALYSES_IN_FLIGHT.set_function(lambda: scheduler.in_flight)
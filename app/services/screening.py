@@ -0,0 +1,141 @@
+"""Local screening of submissions before any model call.
+
+Placeholder, keyboard-mash and copy-pasted submissions are answered with the same
+``clarification_request`` the model would give, without the model round trip. The checks
+are cheap heuristics tuned to pass anything that reads like an attempt at a real idea.
+"""
+
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import List, NamedTuple, Optional
+from ..metrics import SCREENING_DECISIONS, SCREENING_REJECTIONS
+from ..models.models import StartupIdea
+
+INPUT_SCREENING_ENABLED = os.getenv("INPUT_SCREENING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Shannon entropy in bits per character below which a field is treated as noise ("aaaaaaaaaa")
+SCREENING_MIN_CHAR_ENTROPY = float(os.getenv("SCREENING_MIN_CHAR_ENTROPY", "2.5"))
+# Entropy in bits per word of the combined fields ("test test test ...")
+SCREENING_MIN_WORD_ENTROPY = float(os.getenv("SCREENING_MIN_WORD_ENTROPY", "2.0"))
+# Share of Latin-script words that cannot be pronounced ("asdf qwer zxcv ...") above which text is gibberish
+SCREENING_MAX_UNPRONOUNCEABLE_RATIO = float(os.getenv("SCREENING_MAX_UNPRONOUNCEABLE_RATIO", "0.4"))
+# Share of distinct words in the combined fields
+SCREENING_MIN_DISTINCT_RATIO = float(os.getenv("SCREENING_MIN_DISTINCT_RATIO", "0.3"))
+# Word-set overlap (Jaccard) above which two fields count as the same text pasted twice
+SCREENING_MAX_FIELD_OVERLAP = float(os.getenv("SCREENING_MAX_FIELD_OVERLAP", "0.9"))
+
+# Fields the founder writes; the background may be extracted resume text and is not screened
+SCREENED_FIELDS = ("idea", "customer", "problem", "solution")
+
+# Word-level checks need this many words to be meaningful
+_MIN_WORDS = 8
+
+_WORD = re.compile(r"[^\W\d_]+")
+_LATIN_WORD = re.compile(r"[a-z]+")
+
+_PLACEHOLDERS = frozenset(
+    "test testing tests asdf asdfgh asdfghjkl qwerty qwer zxcv xyz abc abcd foo bar baz lorem ipsum dolor sit amet "
+    "sample dummy placeholder todo tbd na none null nothing hello hi hey blah bla random something stuff idea".split()
+)
+
+_VOWELS = frozenset("aeiouy")
+# Four consonants in a row; rare in real words of any Latin-script language, common in keyboard mashing
+_CONSONANT_RUN = re.compile(r"[b-df-hj-np-tv-xz]{4,}")
+
+class ScreeningResult(NamedTuple):
+    reasons: List[str]
+    fields: List[str]
+
+def _char_entropy(text: str) -> float:
+    chars = [c for c in text.casefold() if not c.isspace()]
+    if not chars:
+        return 0.0
+    total = len(chars)
+    return -sum(n / total * math.log2(n / total) for n in Counter(chars).values())
+
+def _word_entropy(words: List[str]) -> float:
+    total = len(words)
+    return -sum(n / total * math.log2(n / total) for n in Counter(words).values())
+
+def _strip_accents(word: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", word) if not unicodedata.combining(c))
+
+def _unpronounceable(word: str) -> bool:
+    return not _VOWELS.intersection(word) or _CONSONANT_RUN.search(word) is not None
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+def screen_submission(startup_data: StartupIdea) -> Optional[ScreeningResult]:
+    """Return why the submission looks like junk, or None if it should go to the model"""
+    texts = {field: getattr(startup_data, field) or "" for field in SCREENED_FIELDS}
+    field_words = {field: _WORD.findall(text.casefold()) for field, text in texts.items()}
+    reasons, flagged = [], []
+
+    def flag(reason: str, *fields: str) -> None:
+        if reason not in reasons:
+            reasons.append(reason)
+        flagged.extend(field for field in fields if field not in flagged)
+
+    for field, words in field_words.items():
+        if not words or all(word in _PLACEHOLDERS for word in words):
+            flag("placeholder", field)
+        elif _char_entropy(texts[field]) < SCREENING_MIN_CHAR_ENTROPY:
+            flag("low_entropy", field)
+
+    words = [word for field_list in field_words.values() for word in field_list]
+    if len(words) >= _MIN_WORDS:
+        if _word_entropy(words) < SCREENING_MIN_WORD_ENTROPY:
+            flag("repetition")
+        elif len(set(words)) / len(words) < SCREENING_MIN_DISTINCT_RATIO:
+            flag("repetition")
+        # Letter patterns rather than a word list, so any Latin-script language (Spanish, romanized
+        # Hindi, ...) passes; words in other scripts are not checked
+        latin = [word for word in map(_strip_accents, words) if _LATIN_WORD.fullmatch(word)]
+        if len(latin) >= _MIN_WORDS and sum(map(_unpronounceable, latin)) / len(latin) > SCREENING_MAX_UNPRONOUNCEABLE_RATIO:
+            flag("gibberish")
+
+    word_sets = {field: set(words) for field, words in field_words.items() if len(words) >= 3}
+    fields = list(word_sets)
+    for i, first in enumerate(fields):
+        for second in fields[i + 1:]:
+            if _jaccard(word_sets[first], word_sets[second]) >= SCREENING_MAX_FIELD_OVERLAP:
+                flag("duplicate_fields", first, second)
+
+    return ScreeningResult(reasons, flagged) if reasons else None
+
+_REASON_MESSAGES = {
+    "placeholder": "some fields contain placeholder text such as \"test\" or \"asdf\"",
+    "low_entropy": "some fields look like repeated or random characters",
+    "repetition": "the same words are repeated instead of describing the idea",
+    "gibberish": "the text does not read as meaningful sentences",
+    "duplicate_fields": "the same text was pasted into several fields",
+}
+
+def clarification_for(result: ScreeningResult) -> dict:
+    """The clarification_request the model would have returned for this submission"""
+    problems = "; ".join(_REASON_MESSAGES[reason] for reason in result.reasons)
+    fields = f" (check: {', '.join(result.fields)})" if result.fields else ""
+    return {
+        "type": "clarification_request",
+        "message": (
+            f"We could not analyze this submission because {problems}{fields}. Please describe your idea, "
+            "your target customer, the problem they face and your solution in a few plain sentences each."
+        ),
+        "screening": {"reasons": result.reasons, "fields": result.fields},
+    }
+
+def prescreen(startup_data: StartupIdea) -> Optional[dict]:
+    """Screen a submission and count the outcome; returns a clarification_request for junk"""
+    if not INPUT_SCREENING_ENABLED:
+        return None
+    result = screen_submission(startup_data)
+    if result is None:
+        SCREENING_DECISIONS.inc(result="passed")
+        return None
+    SCREENING_DECISIONS.inc(result="rejected")
+    for reason in result.reasons:
+        SCREENING_REJECTIONS.inc(reason=reason)
+    return clarification_for(result)
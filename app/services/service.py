@@ -1,295 +1,413 @@
-from openai import OpenAI, APIError as OpenAIError
-from fastapi import HTTPException
+import asyncio
 import os
 import json
-from dotenv import load_dotenv
-from ..models.models import StartupIdea
-from ..exceptions import AIAnalysisError
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Optional, Tuple
+from pydantic import ValidationError
+from ..models.models import AI_RESPONSE_ADAPTER, AnalysisData, StartupIdea
+from ..exceptions import AIAnalysisError, AIServiceUnavailableError
+from .cache import ANALYSIS_CACHE_ENABLED, analysis_cache, make_cache_key
+from .streaming import SectionStreamParser
+from .resilience import resilient_caller
+from .hedging import LatencyTracker, ModelSpec, latency_tracker, parse_model_specs, race_hedged
+from .prompts import PROMPT_VERSION, SECTION_FIELDS, prompt_builder
+from .screening import prescreen
+from ..metrics import ANALYSIS_REUSE_LOOKUPS, LLM_REQUEST_DURATION, LLM_TOKENS
+from ..reports import get_report
+from ..reports.similarity import idea_text, similarity_index
 
-# Load environment variables
-load_dotenv()
+# The OpenAI SDK is slow to import, so it is loaded when the client is opened
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, APIError as OpenAIError
 
 # Configuration
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+ANALYSIS_MODEL = os.getenv("ANALYSIS_MODEL", "arcee-ai/trinity-large-preview:free")
 
-if not OPENROUTER_API_KEY:
-    raise ValueError("OPENROUTER_API_KEY environment variable is not set")
+# Connection pool and timeout settings for the shared LLM client
+OPENROUTER_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "100"))
+OPENROUTER_MAX_KEEPALIVE = int(os.getenv("OPENROUTER_MAX_KEEPALIVE", "20"))
+OPENROUTER_KEEPALIVE_EXPIRY = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "30"))
+OPENROUTER_CONNECT_TIMEOUT = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "10"))
+OPENROUTER_READ_TIMEOUT = float(os.getenv("OPENROUTER_READ_TIMEOUT", "120"))
+OPENROUTER_POOL_TIMEOUT = float(os.getenv("OPENROUTER_POOL_TIMEOUT", "30"))
 
-client = OpenAI(
-    base_url=OPENROUTER_BASE_URL,
-    api_key=OPENROUTER_API_KEY,
-)
+# Models tried in order, each with its own timeout (e.g. "model-a=90,model-b=60").
+# Later models are only called as hedges when earlier ones are slow or fail.
+ANALYSIS_MODELS = parse_model_specs(os.getenv("ANALYSIS_MODELS", ANALYSIS_MODEL), OPENROUTER_READ_TIMEOUT)
+ANALYSIS_CACHE_MODEL_KEY = ",".join(spec.name for spec in ANALYSIS_MODELS)
+
+# "single" asks one completion for the whole report; "sectioned" generates every section concurrently
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "single")
+
+# Reuse the analysis of a completed report whose idea is at least this similar (cosine, 0-1); 0 disables it
+ANALYSIS_REUSE_SIMILARITY = float(os.getenv("ANALYSIS_REUSE_SIMILARITY", "0"))
+
+# Sections written about the submitter's background, never carried over to another submission
+FOUNDER_SECTIONS = ("founder_market_fit", "yc_criteria_assessment")
+FOUNDER_SECTION_FIELDS = frozenset(field for section in FOUNDER_SECTIONS for field in SECTION_FIELDS[section])
+
+# Shared async client, created and closed by the application lifespan
+_client: Optional["AsyncOpenAI"] = None
+
+def open_client() -> "AsyncOpenAI":
+    """Create the shared, connection-pooled async LLM client if needed"""
+    global _client
+    if _client is None:
+        if not OPENROUTER_API_KEY:
+            raise ValueError("OPENROUTER_API_KEY environment variable is not set")
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENROUTER_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENROUTER_MAX_KEEPALIVE,
+                keepalive_expiry=OPENROUTER_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                OPENROUTER_READ_TIMEOUT,
+                connect=OPENROUTER_CONNECT_TIMEOUT,
+                pool=OPENROUTER_POOL_TIMEOUT,
+            ),
+        )
+        _client = AsyncOpenAI(
+            base_url=OPENROUTER_BASE_URL,
+            api_key=OPENROUTER_API_KEY,
+            http_client=http_client,
+            # Retries are handled by the resilience layer
+            max_retries=0,
+        )
+    return _client
+
+async def close_client() -> None:
+    """Close the shared LLM client and release its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+def get_client() -> "AsyncOpenAI":
+    """Return the shared LLM client, opening it lazily outside the lifespan"""
+    return _client if _client is not None else open_client()
+
+# Section calls are much shorter than full reports, so they get their own hedge statistics
+section_latency_tracker = LatencyTracker()
+
+def _provider_error_message(error: "OpenAIError") -> str:
+    body = getattr(error, "body", None)
+    if isinstance(body, dict) and body.get("message"):
+        return body["message"]
+    return "An unknown error occurred with the AI provider."
+
+@contextmanager
+def _provider_errors():
+    """Translate provider and unexpected errors into AIAnalysisError"""
+    from openai import APIError as OpenAIError
+
+    try:
+        yield
+    except AIAnalysisError:
+        raise
+    except OpenAIError as e:
+        raise AIAnalysisError(f"The AI service returned an error: {_provider_error_message(e)}") from e
+    except asyncio.TimeoutError as e:
+        raise AIAnalysisError("The AI service did not respond in time.") from e
+    except Exception as e:
+        raise AIAnalysisError(f"An unexpected error occurred during AI analysis: {str(e)}") from e
+
+def _record_usage(model: str, usage: Any) -> None:
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, model=model, type="prompt")
+    LLM_TOKENS.inc(usage.completion_tokens or 0, model=model, type="completion")
 
 class AIAnalysisService:
     def __init__(self):
-        self.client = client
+        self.client = get_client()
     
     async def analyze_startup(self, startup_data: StartupIdea) -> dict:
-        """Analyze startup idea using AI models"""
+        """Analyze startup idea using AI models, serving repeat submissions from the cache"""
+        
+        clarification = prescreen(startup_data)
+        if clarification is not None:
+            return clarification
+        
+        cache_key = None
+        if ANALYSIS_CACHE_ENABLED:
+            cache_key = make_cache_key(startup_data, ANALYSIS_CACHE_MODEL_KEY, f"{PROMPT_VERSION}-{ANALYSIS_MODE}")
+            cached = await analysis_cache.get(cache_key)
+            if cached is not None:
+                cached["generation"] = {**cached.get("generation", {}), "cache_hit": True}
+                return cached
+        
+        if ANALYSIS_REUSE_SIMILARITY > 0:
+            reused = await self._reuse_similar_analysis(startup_data)
+            if reused is not None:
+                return reused
+        
+        analysis = await self._run_analysis(startup_data)
         
-        # The system prompt sets the persona, while the user prompt contains the detailed instructions and data.
-        system_prompt = """You are a senior indian startup analyst and venture capitalist with 20+ years of experience. Your analysis is brutally honest, data-driven, and avoids fluff. You are a world-class expert in evaluating new business ideas.
-        You will be given a startup idea submission and you must return your analysis ONLY in the requested JSON format."""
+        # Only full analyses are cached; clarification requests should be re-evaluated
+        if cache_key is not None and analysis.get("type") == "analysis":
+            await analysis_cache.set(cache_key, analysis)
+        return analysis
+    
+    async def _reuse_similar_analysis(self, startup_data: StartupIdea) -> Optional[dict]:
+        """Reuse the analysis of the most similar completed report above the reuse threshold.
 
-        user_prompt = self._create_analysis_prompt(startup_data)
+        Similarity only covers the idea, so the sections written about the founder are
+        generated afresh for this submission rather than copied from someone else's report.
+        """
+        for report_id, score in similarity_index.search_text(idea_text(startup_data), k=1, min_score=ANALYSIS_REUSE_SIMILARITY):
+            report = await get_report(report_id)
+            if report is None or report.get("status") != "completed" or not isinstance(report.get("analysis"), dict):
+                # Deleted or replaced by another process since it was indexed
+                similarity_index.remove(report_id)
+                break
+            data = {
+                field: report["analysis"][field]
+                for field in AnalysisData.model_fields
+                if field in report["analysis"] and field not in FOUNDER_SECTION_FIELDS
+            }
+            with _provider_errors():
+                sections = await asyncio.gather(*(self._generate_section(startup_data, name) for name in FOUNDER_SECTIONS))
+            generations = {}
+            for name, (section, generation) in zip(FOUNDER_SECTIONS, sections):
+                if section.get("type") == "clarification_request":
+                    return section
+                data.update(section["data"])
+                generations[name] = generation
+            analysis = self._validate_analysis_structure({"type": "analysis", "data": data})
+            analysis["generation"] = {
+                **(report.get("generation") or {}),
+                "reused_from": report_id,
+                "similarity": round(score, 4),
+                "regenerated_sections": generations,
+            }
+            ANALYSIS_REUSE_LOOKUPS.inc(result="reused")
+            return analysis
+        ANALYSIS_REUSE_LOOKUPS.inc(result="miss")
+        return None
+    
+    async def _run_analysis(self, startup_data: StartupIdea) -> dict:
+        """Call the configured models (hedging slow ones) and parse the winning response"""
+        
+        if ANALYSIS_MODE == "sectioned":
+            with _provider_errors():
+                return await self._run_sectioned_analysis(startup_data)
+        
+        prompt = prompt_builder.build(startup_data)
+        with _provider_errors():
+            analysis, generation = await race_hedged(
+                ANALYSIS_MODELS,
+                lambda spec: self._attempt_model(spec, prompt.messages, startup_data),
+                latency_tracker,
+            )
+        analysis["generation"] = {
+            **generation,
+            "prompt_version": PROMPT_VERSION,
+            "input_tokens": prompt.input_tokens,
+            "truncated_fields": prompt.truncated_fields,
+        }
+        return analysis
+    
+    async def _run_sectioned_analysis(self, startup_data: StartupIdea) -> dict:
+        """Generate every report section concurrently and merge them into one analysis"""
+        started = time.monotonic()
+        tasks = {name: asyncio.create_task(self._generate_section(startup_data, name)) for name in SECTION_FIELDS}
+        try:
+            # The overview section also screens the input; stop early if it asks for clarification
+            overview, _ = await tasks["overview"]
+            if overview.get("type") == "clarification_request":
+                return overview
+            results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
         
+        data = {}
+        for section, _ in results.values():
+            data.update(section["data"])
+        analysis = self._validate_analysis_structure({"type": "analysis", "data": data})
+        analysis["generation"] = {
+            "mode": "sectioned",
+            "latency": round(time.monotonic() - started, 3),
+            "prompt_version": PROMPT_VERSION,
+            "input_tokens": sum(generation["input_tokens"] for _, generation in results.values()),
+            "sections": {name: generation for name, (_, generation) in results.items()},
+        }
+        return analysis
+    
+    async def regenerate_section(self, startup_data: StartupIdea, section: str) -> dict:
+        """Generate a single report section, returning its fields"""
+        with _provider_errors():
+            result, generation = await self._generate_section(startup_data, section)
+        if result.get("type") == "clarification_request":
+            raise AIAnalysisError(f"The AI asked for clarification instead of regenerating '{section}': {result.get('message', '')}")
+        return {"data": result["data"], "generation": generation}
+    
+    async def _generate_section(self, startup_data: StartupIdea, section: str) -> Tuple[dict, dict]:
+        prompt = prompt_builder.build_section(startup_data, section)
+        result, generation = await race_hedged(
+            ANALYSIS_MODELS,
+            lambda spec: self._attempt_section(spec, prompt.messages, section),
+            section_latency_tracker,
+        )
+        return result, {**generation, "input_tokens": prompt.input_tokens, "truncated_fields": prompt.truncated_fields}
+    
+    async def _complete(self, spec: ModelSpec, messages: List[dict]):
+        """Request a JSON completion from one model, recording latency and token usage"""
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            response = self.client.chat.completions.create(
-                model="arcee-ai/trinity-large-preview:free",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user", 
-                        "content": user_prompt
-                    }
-                ],
+            response = await resilient_caller.call(lambda: self.client.chat.completions.create(
+                model=spec.name,
+                messages=messages,
                 temperature=0.7,
-                response_format={"type": "json_object"}
-            )
-            
-            if not response.choices or not response.choices[0].message.content:
-                raise AIAnalysisError("The AI service returned an empty or invalid response.")
-                
-            ai_response_text = response.choices[0].message.content
-            return self._parse_analysis(ai_response_text, startup_data)
-
-        except OpenAIError as e:
-            error_message = e.body.get("message", "An unknown error occurred with the AI provider.")
-            raise AIAnalysisError(f"The AI service returned an error: {error_message}") from e
+                response_format={"type": "json_object"},
+                timeout=spec.timeout
+            ))
+            outcome = "ok"
+        except asyncio.CancelledError:
+            # Hedged attempts that lose the race are cancelled
+            outcome = "cancelled"
+            raise
+        finally:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, model=spec.name, outcome=outcome)
+        _record_usage(spec.name, getattr(response, "usage", None))
+        return response
+    
+    async def _attempt_section(self, spec: ModelSpec, messages: List[dict], section: str) -> dict:
+        response = await self._complete(spec, messages)
+        
+        if not response.choices or not response.choices[0].message.content:
+            raise AIAnalysisError("The AI service returned an empty or invalid response.")
         
-        except Exception as e:
-            raise AIAnalysisError(f"An unexpected error occurred during AI analysis: {str(e)}") from e
+        return self._parse_section(response.choices[0].message.content, section)
     
-    def _create_analysis_prompt(self, data: StartupIdea) -> str:
-        return f'''
-Here is the startup idea submission I need you to analyze:
-
-<submission>
-**Startup Idea:** {data.idea}
-**Target Customer:** {data.customer}
-**Problem:** {data.problem}
-**Solution:** {data.solution}
-**Founder Background:** {data.background}
-</submission>
-
-
-## INSTRUCTIONS
-
-Your task is to evaluate the submission based on the following two-step process:
-
-**Step 1: Evaluate Input**
-First, assess the provided submission. 
-- If the input is valid and provides significant idea that makes sense and is not just random words put together, proceed to Step 2.
-- If the input is too short, vague, contains placeholder text (e.g., "test", "asdf"), or is otherwise nonsensical, **DO NOT** perform the analysis. Instead, you MUST respond with the following JSON object:
-
-```json
-{{
-    "type": "clarification_request",
-    "message": "<Your user-friendly message asking for more specific and meaningful input. Explain what is missing or unclear and guide the user on how to improve their submission.>"
-}}
-```
-- Do not ask user for competitor analysis, market size, growth rate or such matrices from user as you are responsible to provide that in your validation research.
-
-**Step 2: Perform In-Depth Validation Analysis**
-If the input quality is sufficient, you MUST provide a detailed, actionable, and brutally honest startup validation analysis focused for indian startup ecosystem unless specified otherwise in target audience. Your entire response must be a single JSON object, using the exact structure and keys shown in the template below. Fill in the values based on your expert analysis.
+    async def _attempt_model(self, spec: ModelSpec, messages: List[dict], startup_data: StartupIdea) -> dict:
+        """Call one model and parse its response; a response only counts once it parses"""
+        response = await self._complete(spec, messages)
+        
+        if not response.choices or not response.choices[0].message.content:
+            raise AIAnalysisError("The AI service returned an empty or invalid response.")
+        
+        return self._parse_analysis(response.choices[0].message.content, startup_data)
+    
+    async def stream_analysis(self, startup_data: StartupIdea) -> AsyncIterator[Tuple[str, Optional[str], Any]]:
+        """Stream the analysis from the model.
 
-**JSON ANALYSIS TEMPLATE (FILL THIS OUT):**
-```json
-{{
-    "type": "analysis",
-    "data": {{
-        "viability_score": 0.0, // A score from 0.0 to 10.0 representing overall potential.
-        "market_size": "", // Estimated market size (e.g., "$10B+").
-        "competition_level": "Low/Medium/High", // Overall competition level.
-        "time_to_market": "", // Estimated time to launch an MVP (e.g., "3-6 months").
-        "market_analysis": {{
-            "tam": "", // Total Addressable Market analysis and estimated value.
-            "sam": "", // Serviceable Addressable Market analysis and estimated value.
-            "som": "", // Serviceable Obtainable Market analysis and estimated value.
-            "growth_rate": "", // Estimated market growth rate (e.g., "15% CAGR").
-            "key_trends": [] // List of 3-5 key market trends.
-        }},
-        "competitive_landscape": {{
-            "direct_competitors": [ // List of 2-3 main direct competitors.
-                {{"name": "", "market_share": "", "weakness": ""}}
-            ],
-            "competitive_advantage": "", // What is this idea's unique advantage?
-            "market_gap": "" // What specific market gap does this idea fill?
-        }},
-        "risk_assessment": {{
-            "high_risks": [], // List of 2-3 high-impact risks.
-            "medium_risks": [], // List of 2-3 medium-impact risks.
-            "low_risks": [] // List of 2-3 low-impact risks.
-        }},
-        "founder_market_fit": {{
-            "score": 0.0, // A score from 0.0 to 10.0.
-            "strengths": [], // List of the founder's key strengths for this venture.
-            "gaps": [], // List of critical gaps in the founder's experience or skills.
-            "recommendations": [] // Actionable recommendations to improve founder-market fit.
-        }},
-        "yc_criteria_assessment": {{
-            "problem_clarity": 0, // Score 0-10 for how well the problem is defined.
-            "solution_fit": 0, // Score 0-10 for how well the solution fits the problem.
-            "market_size": 0, // Score 0-10 for the market potential.
-            "founder_strength": 0, // Score 0-10 for the founder's suitability.
-            "traction_potential": 0, // Score 0-10 for the potential to gain early traction.
-            "overall_score": 0.0, // The average of the scores above.
-            "notes": "" // Your summary notes on the YC assessment.
-        }},
-        "recommendations": {{
-            "mvp_strategy": "", // A concise, actionable MVP strategy.
-            "funding_needs": "", // Initial funding requirements (e.g., "$25k for MVP", "Bootstrapped").
-            "key_partnerships": [], // List of potential key partners.
-            "success_metrics": [] // List of 2-3 key metrics to track for success.
-        }},
-        "financial_projections": {{
-            "revenue_model": "", // e.g., "SaaS Subscription", "Commission-based".
-            "avg_booking_value": "", // Estimated average value of a transaction.
-            "monthly_bookings_y1": "", // Projected bookings in month 12.
-            "projected_mrr_y1": "", // Projected MRR at the end of year 1.
-            "customer_acquisition_cost": "", // Estimated CAC.
-            "customer_lifetime_value": "", // Estimated LTV.
-            "break_even_timeline": "", // Estimated time to break even.
-            "funding_requirements": [
-                {{"stage": "Pre-Seed/Seed", "amount": "", "use": ""}}
-            ]
-        }},
-        "action_plan": {{
-            "phase_1": {{
-                "timeline": "0-3 months",
-                "title": "Validation & Planning",
-                "tasks": [] // List of tasks for this phase.
-            }},
-            "phase_2": {{
-                "timeline": "3-6 months",
-                "title": "Development & Alpha Testing",
-                "tasks": [] // List of tasks for this phase.
-            }},
-            "phase_3": {{
-                "timeline": "6-12 months",
-                "title": "Launch & Growth",
-                "tasks": [] // List of tasks for this phase.
-            }}
-        }}
-    }}
-}}
-```
+        Yields ``("section", name, value)`` as soon as each member of the analysis ``data``
+        object is complete, then ``("result", None, analysis)`` with the fully parsed and
+        validated response.
+        """
+        
+        clarification = prescreen(startup_data)
+        if clarification is not None:
+            yield "result", None, clarification
+            return
+        
+        cache_key = None
+        if ANALYSIS_CACHE_ENABLED:
+            cache_key = make_cache_key(startup_data, ANALYSIS_CACHE_MODEL_KEY, f"{PROMPT_VERSION}-{ANALYSIS_MODE}")
+            cached = await analysis_cache.get(cache_key)
+            if cached is not None:
+                cached["generation"] = {**cached.get("generation", {}), "cache_hit": True}
+                for name, value in cached["data"].items():
+                    yield "section", name, value
+                yield "result", None, cached
+                return
+        
+        from openai import APIError as OpenAIError
 
-Remember: Your final output must be **ONLY** the single, valid JSON object specified in the templates above. Do not include any other text, explanations, or formatting.
-'''
+        parser = SectionStreamParser()
+        prompt = prompt_builder.build(startup_data)
+        model = ANALYSIS_MODELS[0].name
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            # The concurrency slot is held until the whole response has streamed in
+            async with resilient_caller.hold(lambda: self.client.chat.completions.create(
+                model=model,
+                messages=prompt.messages,
+                temperature=0.7,
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True}
+            )) as stream:
+                async for chunk in stream:
+                    # The final chunk carries usage and no choices
+                    _record_usage(model, getattr(chunk, "usage", None))
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for scope, name, value in parser.feed(chunk.choices[0].delta.content):
+                        if scope == "data":
+                            yield "section", name, value
+            outcome = "ok"
 
+        except OpenAIError as e:
+            raise AIAnalysisError(f"The AI service returned an error: {_provider_error_message(e)}") from e
+        finally:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, model=model, outcome=outcome)
+        
+        if not parser.text.strip():
+            raise AIAnalysisError("The AI service returned an empty or invalid response.")
+        
+        analysis = self._parse_analysis(parser.text, startup_data)
+        analysis["generation"] = {
+            "model": model,
+            "hedged": False,
+            "streamed": True,
+            "prompt_version": PROMPT_VERSION,
+            "input_tokens": prompt.input_tokens,
+            "truncated_fields": prompt.truncated_fields,
+        }
+        if cache_key is not None and analysis.get("type") == "analysis":
+            await analysis_cache.set(cache_key, analysis)
+        yield "result", None, analysis
+    
     def _validate_analysis_structure(self, analysis: dict) -> dict:
-        """Validate and ensure all required fields are present with correct types"""
+        """Validate the analysis data against the typed section models, filling defaults and coercing values"""
         
         if analysis.get("type") == "analysis":
-            # Default structure template
-            default_structure = {
-                "viability_score": 0,
-                "market_size": "Unknown",
-                "competition_level": "Medium",
-                "time_to_market": "6-12 months",
-                "market_analysis": {
-                    "tam": "Market data not available",
-                    "sam": "Market data not available",
-                    "som": "Market data not available", 
-                    "growth_rate": "Unknown",
-                    "key_trends": ["Market trend analysis needed"]
-                },
-                "competitive_landscape": {
-                    "direct_competitors": [{"name": "Unknown", "market_share": "Unknown", "weakness": "Requires analysis"}],
-                    "competitive_advantage": "Needs identification",
-                    "market_gap": "Requires market research"
-                },
-                "risk_assessment": {
-                    "high_risks": ["Market validation needed"],
-                    "medium_risks": ["Competition analysis needed"],
-                    "low_risks": ["Technical implementation"]
-                },
-                "founder_market_fit": {
-                    "score": 7.0,
-                    "strengths": ["Relevant background"],
-                    "gaps": ["Industry-specific experience"],
-                    "recommendations": ["Gain market expertise"]
-                },
-                "yc_criteria_assessment": {
-                    "problem_clarity": 7,
-                    "solution_fit": 7,
-                    "market_size": 7,
-                    "founder_strength": 7,
-                    "traction_potential": 7,
-                    "overall_score": 7.0,
-                    "notes": "Requires deeper validation"
-                },
-                "recommendations": {
-                    "mvp_strategy": "Build and test minimum viable product",
-                    "funding_needs": "Determine based on market research",
-                    "key_partnerships": ["Industry partnerships needed"],
-                    "success_metrics": ["User acquisition", "Revenue growth"]
-                },
-                "financial_projections": {
-                    "revenue_model": "To be determined",
-                    "avg_booking_value": "Unknown",
-                    "monthly_bookings_y1": "To be projected", 
-                    "projected_mrr_y1": "Unknown",
-                    "customer_acquisition_cost": "To be calculated",
-                    "customer_lifetime_value": "To be calculated",
-                    "break_even_timeline": "12-18 months",
-                    "funding_requirements": [
-                        {"stage": "Seed", "amount": "$500k-1M", "use": "MVP Development & Market Entry"}
-                    ]
-                },
-                "action_plan": {
-                    "phase_1": {
-                        "timeline": "0-3 months",
-                        "title": "Validation & Planning",
-                        "tasks": ["Market Research", "MVP Planning"]
-                    },
-                    "phase_2": {
-                        "timeline": "3-6 months",
-                        "title": "Development & Testing",
-                        "tasks": ["MVP Development", "Beta Testing"]
-                    },
-                    "phase_3": {
-                        "timeline": "6-12 months",
-                        "title": "Launch & Growth",
-                        "tasks": ["Market Launch", "Customer Acquisition"]
-                    }
-                }
-            }
-            
-            # Merge provided analysis with default structure
-            analysis_data = analysis.get("data", {})
-            for key in default_structure:
-                if key not in analysis_data:
-                    analysis_data[key] = default_structure[key]
-            analysis["data"] = analysis_data
+            analysis["data"] = AnalysisData.model_validate(analysis.get("data", {})).model_dump()
                     
         return analysis
     
+    def _parse_section(self, ai_response: str, section: str) -> dict:
+        """Parse one section response, keeping only the fields that section owns"""
+        try:
+            parsed = json.loads(ai_response)
+        except json.JSONDecodeError as e:
+            raise AIAnalysisError(f"Failed to decode the AI's '{section}' response as JSON.") from e
+        
+        if not isinstance(parsed, dict):
+            raise AIAnalysisError(f"The AI's '{section}' response is not a JSON object.")
+        if parsed.get("type") == "clarification_request":
+            return parsed
+        
+        data = parsed.get("data", parsed)
+        fields = {key: data[key] for key in SECTION_FIELDS[section] if isinstance(data, dict) and key in data}
+        if not fields:
+            raise AIAnalysisError(f"The AI's '{section}' response did not contain any of its fields.")
+        return {"type": "analysis", "data": fields}
+    
     def _parse_analysis(self, ai_response: str, startup_data: StartupIdea) -> dict:
-        """Parse and validate AI response"""
+        """Parse and validate AI response in a single pass with the compiled response adapter"""
         try:
-            analysis = json.loads(ai_response)
-            
-            # Handle clarification requests, which are valid responses
-            if analysis.get("type") == "clarification_request":
-                return analysis
-
-            # For analysis types, validate the structure
-            if analysis.get("type") == "analysis":
-                if "data" not in analysis:
-                    raise AIAnalysisError("AI response is missing the 'data' field for analysis type.")
-                return self._validate_analysis_structure(analysis)
+            return AI_RESPONSE_ADAPTER.validate_json(ai_response).model_dump()
 
-            # If the type is neither clarification nor analysis, it's an unknown format
-            raise AIAnalysisError(f"AI response returned an unknown type: '{analysis.get('type', 'N/A')}'")
-
-        except json.JSONDecodeError as e:
-            raise AIAnalysisError(f"Failed to decode the AI's response as JSON. Raw response: {ai_response}") from e
-        except Exception as e:
-            # Catch any other unexpected errors during parsing
-            raise AIAnalysisError(f"An unexpected error occurred while parsing the AI response: {str(e)}") from e
\ No newline at end of file
+        except ValidationError as e:
+            error = e.errors()[0]
+            if error["type"] == "json_invalid":
+                raise AIAnalysisError(f"Failed to decode the AI's response as JSON. Raw response: {ai_response}") from e
+            if error["type"] in ("union_tag_invalid", "union_tag_not_found", "model_type", "model_attributes_type"):
+                tag = error.get("ctx", {}).get("tag", "N/A")
+                raise AIAnalysisError(f"AI response returned an unknown type: '{tag}'") from e
+            if error["type"] == "missing" and error["loc"][-1] == "data":
+                raise AIAnalysisError("AI response is missing the 'data' field for analysis type.") from e
+            raise AIAnalysisError(f"An unexpected error occurred while parsing the AI response: {str(e)}") from e
@@ -0,0 +1,87 @@
+import json
+import re
+from typing import Any, List, Tuple
+
+_DATA_KEY = re.compile(r'^\s*"data"\s*:\s*$')
+
+class SectionStreamParser:
+    """Incrementally scans a streamed analysis JSON document.
+
+    Each call to ``feed`` returns ``(scope, key, value)`` for the members that became
+    complete with that chunk: ``"root"`` members such as ``type`` or ``message`` and,
+    for analysis responses, ``"data"`` members (``market_analysis``, ``risk_assessment``, ...).
+    The full text is kept so the caller can run the regular parser once the stream ends.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_data = False
+        self._top_member_start = 0
+        self._data_member_start = 0
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, Any]]:
+        start = len(self._text)
+        self._text += chunk
+        text = self._text
+        completed: List[Tuple[str, str, Any]] = []
+
+        for i in range(start, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "{" and self._depth == 1:
+                    self._top_member_start = i + 1
+                elif ch == "{" and self._depth == 2 and _DATA_KEY.match(text[self._top_member_start:i]):
+                    self._in_data = True
+                    self._data_member_start = i + 1
+            elif ch in "}]":
+                if self._in_data and self._depth == 2:
+                    completed.extend(self._member("data", self._data_member_start, i))
+                    self._in_data = False
+                elif self._depth == 1:
+                    completed.extend(self._top_member(i))
+                self._depth -= 1
+            elif ch == ",":
+                if self._in_data and self._depth == 2:
+                    completed.extend(self._member("data", self._data_member_start, i))
+                    self._data_member_start = i + 1
+                elif self._depth == 1:
+                    completed.extend(self._top_member(i))
+                    self._top_member_start = i + 1
+
+        return completed
+
+    def _top_member(self, end: int) -> List[Tuple[str, str, Any]]:
+        # The data object has already been emitted member by member
+        member = self._text[self._top_member_start:end]
+        if _DATA_KEY.match(member.split("{", 1)[0]):
+            return []
+        return self._member("root", self._top_member_start, end)
+
+    def _member(self, scope: str, start: int, end: int) -> List[Tuple[str, str, Any]]:
+        member = self._text[start:end].strip()
+        if not member:
+            return []
+        try:
+            return [(scope, key, value) for key, value in json.loads("{" + member + "}").items()]
+        except json.JSONDecodeError:
+            # Malformed fragments are left to the final full-document parse
+            return []
@@ -0,0 +1,169 @@
+"""Standalone analysis worker draining the durable job queue.
+
+Run with ``JOB_BACKEND=sqlite`` on the API and ``python -m app.worker [--concurrency N]``
+next to it. Any number of workers can share one queue file; a job whose worker dies is
+picked up again once its lease expires.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from datetime import datetime
+from pydantic import ValidationError
+from .metrics import ANALYSES_TOTAL
+from .models.models import StartupIdea
+from .services.service import ANALYSIS_REUSE_SIMILARITY, open_client, close_client
+from .services.pipeline import run_analysis
+from .services.jobqueue import JOB_MAX_ATTEMPTS, LeasedJob, SQLiteJobQueue, close_job_queue, get_job_queue
+from .reports import close_store, get_store, save_report
+from .reports.similarity import similarity_index
+
+logger = logging.getLogger(__name__)
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "8"))
+# Seconds between queue polls while it is empty
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+# On SIGTERM, running analyses get this long to finish before they are handed back to the queue
+WORKER_SHUTDOWN_GRACE = float(os.getenv("WORKER_SHUTDOWN_GRACE", "30"))
+
+class AnalysisWorker:
+    """Leases jobs from the durable queue and runs them with bounded concurrency"""
+
+    def __init__(self, queue: SQLiteJobQueue, concurrency: int = WORKER_CONCURRENCY, poll_interval: float = JOB_POLL_INTERVAL):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stopping = asyncio.Event()
+        self._busy = 0
+
+    def stop(self) -> None:
+        """Stop leasing new jobs; running ones are left to finish"""
+        self._stopping.set()
+
+    async def run(self, grace: float = WORKER_SHUTDOWN_GRACE) -> None:
+        slots = [asyncio.create_task(self._slot(), name=f"job-slot-{i}") for i in range(self.concurrency)]
+        logger.info(f"Worker {self.owner} started with {self.concurrency} slots")
+        await self._stopping.wait()
+        logger.info(f"Worker {self.owner} stopping; waiting up to {grace}s for {self._busy} running jobs")
+        # Idle slots exit on their own; busy ones finish or are cancelled after the grace period
+        await asyncio.wait(slots, timeout=grace)
+        for slot in slots:
+            slot.cancel()
+        await asyncio.gather(*slots, return_exceptions=True)
+
+    async def _slot(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await asyncio.to_thread(self.queue.lease, self.owner)
+            except Exception as e:
+                logger.error(f"Leasing a job failed: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._busy += 1
+            try:
+                await self._process(job)
+            except Exception:
+                # Queue or store trouble; the job is retried when its lease expires
+                logger.exception(f"Job {job.id} failed in the worker")
+            finally:
+                self._busy -= 1
+
+    async def _process(self, job: LeasedJob) -> None:
+        if job.attempts > JOB_MAX_ATTEMPTS:
+            error = f"Analysis was abandoned after {job.attempts - 1} interrupted attempts"
+            logger.error(f"Job {job.id}: {error}")
+            ANALYSES_TOTAL.inc(outcome="failed", mode="queued")
+            await asyncio.to_thread(self.queue.bury, job.id, self.owner, error)
+            await save_report(job.id, {
+                "status": "failed",
+                "error": error,
+                "queued_at": job.payload.get("queued_at"),
+                "failed_at": datetime.now().isoformat(),
+            })
+            return
+
+        try:
+            startup_data = StartupIdea.model_validate(job.payload["startup_data"])
+        except (KeyError, TypeError, ValidationError) as e:
+            logger.error(f"Job {job.id} has an invalid payload: {e}")
+            try:
+                await save_report(job.id, {
+                    "status": "failed",
+                    "error": "The analysis job could not be read",
+                    "queued_at": job.payload.get("queued_at"),
+                    "failed_at": datetime.now().isoformat(),
+                })
+            except Exception:
+                # Keep the job; it is retried once the lease expires and buried after JOB_MAX_ATTEMPTS
+                logger.exception(f"Could not mark report {job.id} failed")
+                return
+            ANALYSES_TOTAL.inc(outcome="failed", mode="queued")
+            await asyncio.to_thread(self.queue.complete, job.id, self.owner)
+            return
+
+        run = asyncio.create_task(run_analysis(job.id, startup_data, job.payload.get("queued_at")))
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, run))
+        try:
+            await run
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled():
+                # The lease was lost and the job belongs to another worker now
+                return
+            # Shut down mid-analysis: let another worker start it over
+            await asyncio.shield(asyncio.to_thread(self.queue.release, job.id, self.owner))
+            raise
+        except Exception:
+            # run_analysis records its own failures
+            logger.exception(f"Job {job.id} could not be processed")
+        finally:
+            heartbeat.cancel()
+        await asyncio.to_thread(self.queue.complete, job.id, self.owner)
+
+    async def _heartbeat(self, job_id: str, run: asyncio.Task) -> None:
+        """Keep the lease alive; if it is lost, stop the analysis so the job runs only once"""
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            try:
+                if not await asyncio.to_thread(self.queue.renew, job_id, self.owner):
+                    logger.warning(f"Lost the lease on job {job_id}; stopping its analysis")
+                    run.cancel()
+                    return
+            except Exception as e:
+                logger.error(f"Renewing the lease on job {job_id} failed: {e}")
+
+async def serve(concurrency: int) -> None:
+    open_client()
+    await asyncio.to_thread(get_store)
+    if ANALYSIS_REUSE_SIMILARITY > 0:
+        await similarity_index.start()
+    worker = AnalysisWorker(get_job_queue(), concurrency=concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await similarity_index.stop()
+        await close_client()
+        close_job_queue()
+        close_store()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run analyses from the durable job queue.")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Analyses run at once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(args.concurrency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# benchmarks/compare.py
+"""Compare two benchmark result files: ``python -m benchmarks.compare old.json new.json``"""
+
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+def _change(old, new) -> str:
+    if old in (None, 0) or new is None:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+def compare(old: dict, new: dict) -> None:
+    for scenario, new_levels in new["scenarios"].items():
+        old_levels = {level["concurrency"]: level for level in old["scenarios"].get(scenario, [])}
+        for level in new_levels:
+            previous = old_levels.get(level["concurrency"])
+            if previous is None:
+                continue
+            for name, stats in level["latency"].items():
+                old_stats = previous["latency"].get(name, {})
+                cells = []
+                for metric in METRICS:
+                    old_value = previous.get(metric) if metric == "throughput_rps" else old_stats.get(metric)
+                    new_value = level.get(metric) if metric == "throughput_rps" else stats.get(metric)
+                    cells.append(f"{metric}={old_value}->{new_value} ({_change(old_value, new_value)})")
+                print(f"{scenario:8} c={level['concurrency']:<4} {name:10} " + "  ".join(cells))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    args = parser.parse_args()
+    compare(json.loads(args.old.read_text()), json.loads(args.new.read_text()))
+
+if __name__ == "__main__":
+    main()
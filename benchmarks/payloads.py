@@ -0,0 +1,114 @@
+# benchmarks/payloads.py
+
+import json
+
+# Canned model output matching the analysis template. The same payload also serves
+# sectioned mode, where the service keeps only the fields each section owns.
+ANALYSIS = {
+    "type": "analysis",
+    "data": {
+        "viability_score": 7.2,
+        "market_size": "$2.1B",
+        "competition_level": "Medium",
+        "time_to_market": "6-9 months",
+        "market_analysis": {
+            "tam": "$2.1B",
+            "sam": "$400M",
+            "som": "$12M",
+            "growth_rate": "18% CAGR",
+            "trends": ["Rising smartphone adoption", "Shift to online learning"],
+        },
+        "competitive_landscape": {
+            "direct_competitors": [
+                {"name": "Competitor A", "strength": "Brand", "weakness": "Price", "market_share": "20%"},
+            ],
+            "indirect_competitors": ["Offline tutors"],
+            "competitive_advantage": "Lower cost through automation",
+        },
+        "risk_assessment": {
+            "high_risks": ["Customer acquisition cost"],
+            "medium_risks": ["Content quality"],
+            "low_risks": ["Hosting cost"],
+        },
+        "founder_market_fit": {
+            "score": 7.5,
+            "strengths": ["Domain experience"],
+            "gaps": ["No technical co-founder"],
+            "recommendations": ["Recruit a CTO"],
+        },
+        "yc_criteria_assessment": {
+            "problem_clarity": 8,
+            "solution_fit": 7,
+            "market_size": 7,
+            "founder_strength": 7,
+            "traction_potential": 6,
+            "overall_score": 7.0,
+            "notes": "Promising but unproven.",
+        },
+        "recommendations": {
+            "mvp_strategy": "Launch a WhatsApp-based pilot in one city.",
+            "funding_needs": "$25k for MVP",
+            "key_partnerships": ["Schools"],
+            "success_metrics": ["Weekly active learners"],
+        },
+        "financial_projections": {
+            "revenue_model": "SaaS Subscription",
+            "avg_booking_value": "$8",
+            "monthly_bookings_y1": "3,000",
+            "projected_mrr_y1": "$24k",
+            "customer_acquisition_cost": "$6",
+            "customer_lifetime_value": "$60",
+            "break_even_timeline": "18 months",
+            "funding_requirements": [{"stage": "Pre-Seed/Seed", "amount": "$250k", "use": "Product and growth"}],
+        },
+        "action_plan": {
+            "phase_1": {"timeline": "0-3 months", "title": "Validation & Planning", "tasks": ["Interview 50 parents"]},
+            "phase_2": {"timeline": "3-6 months", "title": "Development & Alpha Testing", "tasks": ["Build the MVP"]},
+            "phase_3": {"timeline": "6-12 months", "title": "Launch & Growth", "tasks": ["Launch in two cities"]},
+        },
+    },
+}
+
+CLARIFICATION = {
+    "type": "clarification_request",
+    "message": "Please describe who the customer is and what problem they have in more detail.",
+}
+
+ANALYSIS_JSON = json.dumps(ANALYSIS)
+CLARIFICATION_JSON = json.dumps(CLARIFICATION)
+
+def submission(n: int) -> dict:
+    """Form fields for a valid, unique submission (unique so the analysis cache is not hit)"""
+    return {
+        "idea": f"An AI tutor that helps school children practice maths at home (run {n})",
+        "customer": "Parents of school children in tier-2 Indian cities",
+        "problem": "Private tutoring is expensive and hard to find outside large cities",
+        "solution": "A low-cost app that gives personalised practice and feedback",
+        "background": "Ten years as a maths teacher and two years as a product manager",
+    }
+
+def make_pdf(pages: int, text: str) -> bytes:
+    """Build a minimal text PDF with the given number of pages"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(pages))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>")
+    font_id = 3 + 2 * pages
+    for i in range(pages):
+        stream = f"BT /F1 12 Tf 50 700 Td ({text} page {i + 1}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
@@ -0,0 +1,303 @@
+# benchmarks/run.py
+"""Run load-test scenarios against the API backed by the stub model server.
+
+By default the stub server and the API are started as subprocesses on free ports;
+pass ``--target`` to benchmark an already running deployment instead.
+
+    python -m benchmarks.run --scenarios analyze,report,pdf --concurrency 1,8,32 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from .payloads import make_pdf, submission
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+TERMINAL_STATUSES = ("completed", "clarification_needed", "failed")
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, min(len(sorted_values), round(q * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(latencies)
+    to_ms = lambda v: round(v * 1000, 2) if v is not None else None
+    return {
+        "count": len(values),
+        "mean_ms": to_ms(sum(values) / len(values)) if values else None,
+        "p50_ms": to_ms(percentile(values, 0.50)),
+        "p95_ms": to_ms(percentile(values, 0.95)),
+        "p99_ms": to_ms(percentile(values, 0.99)),
+        "max_ms": to_ms(values[-1]) if values else None,
+    }
+
+class Recorder:
+    """Collects latencies and status codes for one scenario run"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Counter = Counter()
+
+    def record(self, name: str, latency: float, status: object = None) -> None:
+        self.latencies.setdefault(name, []).append(latency)
+        if status is not None:
+            self.statuses[str(status)] += 1
+
+async def timed(recorder: Recorder, name: str, request: Awaitable[httpx.Response]) -> httpx.Response:
+    started = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as e:
+        recorder.record(name, time.perf_counter() - started, type(e).__name__)
+        raise
+    recorder.record(name, time.perf_counter() - started, response.status_code)
+    return response
+
+class Scenarios:
+    """Closed-loop workloads. Each worker issues requests back to back until the deadline."""
+
+    def __init__(self, client: httpx.AsyncClient, poll_interval: float, pdf_pages: int, report_timeout: float):
+        self.client = client
+        self.poll_interval = poll_interval
+        self.pdf_pages = pdf_pages
+        self.report_timeout = report_timeout
+        self._counter = 0
+        self.report_ids: List[str] = []
+
+    def _next(self) -> int:
+        self._counter += 1
+        return self._counter
+
+    async def _wait_for_report(self, report_id: str, recorder: Recorder, started: float) -> None:
+        # A report stuck in processing must not hold the run far past --duration
+        deadline = started + self.report_timeout
+        while time.perf_counter() < deadline:
+            response = await self.client.get(f"/api/v1/report/{report_id}")
+            status = response.json().get("status") if response.status_code == 200 else None
+            if status in TERMINAL_STATUSES:
+                recorder.record("end_to_end", time.perf_counter() - started)
+                recorder.statuses[f"report_{status}"] += 1
+                return
+            await asyncio.sleep(self.poll_interval)
+        recorder.statuses["report_timeout"] += 1
+
+    async def analyze(self, recorder: Recorder) -> None:
+        """Submit an analysis and poll it to completion"""
+        started = time.perf_counter()
+        response = await timed(recorder, "submit", self.client.post("/api/v1/analyze", data=submission(self._next())))
+        if response.status_code == 200:
+            report_id = response.json()["report_id"]
+            self.report_ids.append(report_id)
+            await self._wait_for_report(report_id, recorder, started)
+        elif response.status_code == 429:
+            await asyncio.sleep(min(float(response.headers.get("Retry-After", "1")), 1.0))
+
+    async def report(self, recorder: Recorder) -> None:
+        """Fetch an existing report, as a polling client would"""
+        report_id = self.report_ids[self._next() % len(self.report_ids)]
+        await timed(recorder, "get", self.client.get(f"/api/v1/report/{report_id}"))
+
+    async def pdf(self, recorder: Recorder) -> None:
+        """Submit an analysis with a resume PDF (unique content, so extraction is never cached)"""
+        n = self._next()
+        form = submission(n)
+        form.pop("background")
+        files = {"resume_file": ("resume.pdf", make_pdf(self.pdf_pages, f"Resume {n} {time.time()}"), "application/pdf")}
+        await timed(recorder, "submit", self.client.post("/api/v1/analyze", data=form, files=files))
+
+async def run_level(workload: Callable[[Recorder], Awaitable[None]], concurrency: int, duration: float) -> dict:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            try:
+                await workload(recorder)
+            except httpx.HTTPError:
+                pass
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    primary = next(iter(recorder.latencies.values()), [])
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(primary),
+        "throughput_rps": round(len(primary) / elapsed, 2) if elapsed else None,
+        "statuses": dict(recorder.statuses),
+        "latency": {name: summarize(values) for name, values in recorder.latencies.items()},
+    }
+
+async def run_scenarios(args: argparse.Namespace, base_url: str) -> Dict[str, List[dict]]:
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2, max_keepalive_connections=max(args.concurrency) * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.request_timeout, limits=limits) as client:
+        scenarios = Scenarios(client, args.poll_interval, args.pdf_pages, args.request_timeout)
+        results: Dict[str, List[dict]] = {}
+        for name in args.scenarios:
+            if name == "report" and not scenarios.report_ids:
+                # Seed a few reports so there is something to poll
+                seed = Recorder()
+                await asyncio.gather(*(scenarios.analyze(seed) for _ in range(args.seed_reports)), return_exceptions=True)
+                if not scenarios.report_ids:
+                    raise SystemExit(
+                        f"The report scenario needs seed reports, but none of {args.seed_reports} submissions "
+                        f"was accepted (statuses: {dict(seed.statuses) or 'no responses'})"
+                    )
+            results[name] = []
+            for concurrency in args.concurrency:
+                level = await run_level(getattr(scenarios, name), concurrency, args.duration)
+                results[name].append(level)
+                print_level(name, level)
+        return results
+
+def print_level(name: str, level: dict) -> None:
+    for metric, stats in level["latency"].items():
+        print(
+            f"{name:8} c={level['concurrency']:<4} {metric:10} n={stats['count']:<6} "
+            f"rps={level['throughput_rps']:<8} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms"
+        )
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready within {timeout:g}s")
+
+@contextmanager
+def process(command: List[str], ready_url: str, env: Optional[Dict[str, str]] = None, verbose: bool = False):
+    output = None if verbose else subprocess.DEVNULL
+    proc = subprocess.Popen(command, cwd=ROOT, env=env, stdout=output, stderr=output)
+    try:
+        wait_until_ready(ready_url)
+        yield proc
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="analyze,report,pdf", type=lambda v: v.split(","), help="Comma-separated: analyze, report, pdf")
+    parser.add_argument("--concurrency", default="1,8,32", type=lambda v: [int(c) for c in v.split(",")], help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per scenario and concurrency level")
+    parser.add_argument("--target", help="Benchmark this running API instead of starting one")
+    parser.add_argument("--latency", default="lognormal:1,0.5", help="Stub latency distribution, e.g. fixed:2 or lognormal:2,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--clarification-rate", type=float, default=0.0)
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE", help="Extra environment for the API process")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--pdf-pages", type=int, default=3)
+    parser.add_argument("--seed-reports", type=int, default=20)
+    parser.add_argument("--request-timeout", type=float, default=60)
+    parser.add_argument("--verbose", action="store_true", help="Show stub and API server logs")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - {"analyze", "report", "pdf"}
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    stub = {
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+        "clarification_rate": args.clarification_rate,
+    }
+    app_env = dict(item.split("=", 1) for item in args.app_env)
+
+    api_ready_s = None
+    with ExitStack() as stack:
+        base_url = args.target
+        if base_url is None:
+            stub_port, app_port = free_port(), free_port()
+            stack.enter_context(process(
+                [sys.executable, "-m", "benchmarks.stub_server", "--port", str(stub_port), "--latency", args.latency,
+                 "--error-rate", str(args.error_rate), "--rate-limit-rate", str(args.rate_limit_rate),
+                 "--clarification-rate", str(args.clarification_rate)],
+                f"http://127.0.0.1:{stub_port}/v1/models",
+                verbose=args.verbose,
+            ))
+            env = {
+                **os.environ,
+                "OPENROUTER_API_KEY": "stub",
+                "OPENROUTER_BASE_URL": f"http://127.0.0.1:{stub_port}/v1",
+                "REPORTS_DIR": stack.enter_context(tempfile.TemporaryDirectory(prefix="ideavisor-bench-")),
+                **app_env,
+            }
+            base_url = f"http://127.0.0.1:{app_port}"
+            spawned = time.perf_counter()
+            stack.enter_context(process(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port), "--log-level", "warning"],
+                f"{base_url}/",
+                env,
+                verbose=args.verbose,
+            ))
+            # Cold start: process spawn until the first successful response
+            api_ready_s = round(time.perf_counter() - spawned, 3)
+            print(f"API ready after {api_ready_s}s")
+        results = asyncio.run(run_scenarios(args, base_url))
+
+    now = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "timestamp": now.isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": args.target,
+            "stub": None if args.target else stub,
+            "app_env": app_env,
+            "api_ready_s": api_ready_s,
+            "duration_s": args.duration,
+        },
+        "scenarios": results,
+    }
+    output = args.output or RESULTS_DIR / f"{now.strftime('%Y%m%dT%H%M%SZ')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/stub_server.py
+"""OpenAI-compatible chat-completions stub for load tests.
+
+Run with ``python -m benchmarks.stub_server --latency lognormal:2,0.5 --error-rate 0.02``
+and point the API at it with ``OPENROUTER_BASE_URL=http://127.0.0.1:9100/v1``.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .payloads import ANALYSIS_JSON, CLARIFICATION_JSON
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Parse a latency distribution in seconds.
+
+    ``fixed:S``, ``uniform:LOW,HIGH``, ``normal:MEAN,STDDEV`` or ``lognormal:MEDIAN,SIGMA``.
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()]
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(*values)
+    if kind == "normal" and len(values) == 2:
+        return lambda: max(0.0, random.gauss(*values))
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda: median * random.lognormvariate(0, sigma)
+    raise ValueError(f"Invalid latency distribution '{spec}'")
+
+@dataclass
+class StubConfig:
+    latency: str = "fixed:0.5"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    clarification_rate: float = 0.0
+    stream_chunk_size: int = 64
+
+def create_stub_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="OpenAI-compatible stub")
+    sample_latency = parse_latency(config.latency)
+    stats = Counter()
+
+    def completion(model: str, content: str) -> dict:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1500, "completion_tokens": len(content) // 4, "total_tokens": 1500 + len(content) // 4},
+        }
+
+    async def stream(model: str, content: str, delay: float):
+        # Spread the sampled latency across the chunks, like a model generating tokens
+        chunks = [content[i:i + config.stream_chunk_size] for i in range(0, len(content), config.stream_chunk_size)]
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex}", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            event = {**base, "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]}
+            yield f"data: {json.dumps(event)}\n\n"
+        yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+        usage = {"prompt_tokens": 1500, "completion_tokens": len(content) // 4, "total_tokens": 1500 + len(content) // 4}
+        yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        delay = sample_latency()
+        stats["requests"] += 1
+
+        roll = random.random()
+        if roll < config.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": "1"},
+                content={"error": {"message": "Rate limit exceeded (stub)", "type": "rate_limit_error"}},
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            await asyncio.sleep(delay)
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "Internal error (stub)", "type": "server_error"}})
+
+        clarify = random.random() < config.clarification_rate
+        stats["clarifications" if clarify else "analyses"] += 1
+        content = CLARIFICATION_JSON if clarify else ANALYSIS_JSON
+        if body.get("stream"):
+            return StreamingResponse(stream(model, content, delay), media_type="text/event-stream")
+        await asyncio.sleep(delay)
+        return completion(model, content)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    return app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default=StubConfig.latency, help="Latency distribution, e.g. lognormal:2,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+    parser.add_argument("--clarification-rate", type=float, default=0.0, help="Fraction of answers that ask for clarification")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        clarification_rate=args.clarification_rate,
+    )
+    uvicorn.run(create_stub_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
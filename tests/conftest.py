@@ -0,0 +1,18 @@
+import types
+import pytest
+from app.services import resilience
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock for the resilience module"""
+    fake = FakeClock()
+    # Only the resilience module sees the fake clock; the event loop keeps the real one
+    monkeypatch.setattr(resilience, "time", types.SimpleNamespace(monotonic=fake, time=resilience.time.time))
+    return fake
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from app.exceptions import AIServiceUnavailableError
+from app.services import hedging
+from app.services.hedging import LatencyTracker, ModelSpec, race_hedged
+from app.services.resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, ResilientCaller, TokenBucket
+
+@pytest.fixture
+def caller():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    return ResilientCaller(TokenBucket(0, 1), AdaptiveConcurrencyLimiter(4, 1, 8, latency_target=60), breaker, max_retries=0)
+
+def half_open(caller: ResilientCaller, clock) -> None:
+    caller.breaker.record_failure()
+    clock.now += 31
+
+def test_hedge_winner_cancels_the_probe_loser(monkeypatch, clock, caller):
+    monkeypatch.setattr(hedging, "HEDGE_INITIAL_DELAY", 0.01)
+    half_open(caller, clock)
+
+    async def attempt(spec: ModelSpec):
+        if spec.name == "slow":
+            # Becomes the half-open probe and is cancelled when "fast" wins
+            return await caller.call(lambda: asyncio.sleep(10))
+        return "fast result"
+
+    async def scenario():
+        result, generation = await race_hedged([ModelSpec("slow", 60), ModelSpec("fast", 60)], attempt, LatencyTracker())
+        assert result == "fast result"
+        assert generation["attempts"]["slow"]["status"] == "cancelled"
+
+    asyncio.run(scenario())
+    assert not caller.breaker._probe_in_flight
+    clock.now += 31
+    assert asyncio.run(caller.call(lambda: asyncio.sleep(0, "ok"))) == "ok"
+    assert caller.breaker.state == "closed"
+
+def test_timed_out_probe_leaves_breaker_usable(clock, caller):
+    half_open(caller, clock)
+
+    async def attempt(spec: ModelSpec):
+        return await caller.call(lambda: asyncio.sleep(10))
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(race_hedged([ModelSpec("slow", 0.01)], attempt, LatencyTracker()))
+    assert caller.breaker.state == "open"
+    with pytest.raises(AIServiceUnavailableError):
+        caller.breaker.before_call()
+    clock.now += 31
+    assert asyncio.run(caller.call(lambda: asyncio.sleep(0, "ok"))) == "ok"
+
+def test_hedge_starts_next_model_after_failure():
+    async def attempt(spec: ModelSpec):
+        if spec.name == "broken":
+            raise RuntimeError("boom")
+        return spec.name
+
+    result, generation = asyncio.run(race_hedged([ModelSpec("broken", 60), ModelSpec("backup", 60)], attempt, LatencyTracker()))
+    assert result == "backup"
+    assert generation["attempts"]["broken"]["status"] == "failed"
+    assert generation["hedged"]
+
+def test_parse_model_specs():
+    assert hedging.parse_model_specs("a=90, b", 60) == [ModelSpec("a", 90.0), ModelSpec("b", 60)]
+    with pytest.raises(ValueError):
+        hedging.parse_model_specs(" , ", 60)
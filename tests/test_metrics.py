@@ -0,0 +1,39 @@
+import pytest
+from app.metrics import Counter, Gauge, Histogram, Registry, _Metric
+from app import metrics
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    registry = Registry()
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    return registry
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("base", "Not a metric type.")
+
+def test_counter_renders_labelled_samples(registry):
+    counter = Counter("analyses_total", "Finished analyses.", ("outcome", "mode"))
+    counter.inc(outcome="failed", mode="queued")
+    counter.inc(2, outcome="failed", mode="queued")
+    assert registry.render().splitlines() == [
+        "# HELP analyses_total Finished analyses.",
+        "# TYPE analyses_total counter",
+        'analyses_total{outcome="failed",mode="queued"} 3',
+    ]
+
+def test_gauge_function_is_read_at_scrape_time(registry):
+    depth = [4]
+    Gauge("jobs_queued", "Queued jobs.", function=lambda: depth[0])
+    depth[0] = 7
+    assert "jobs_queued 7" in registry.render()
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram("duration_seconds", "Durations.", buckets=(1, 5))
+    for value in (0.5, 2, 10):
+        histogram.observe(value)
+    lines = registry.render().splitlines()
+    assert 'duration_seconds_bucket{le="1"} 1' in lines
+    assert 'duration_seconds_bucket{le="5"} 2' in lines
+    assert 'duration_seconds_bucket{le="+Inf"} 3' in lines
+    assert "duration_seconds_count 3" in lines
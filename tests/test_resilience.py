@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from app.exceptions import AIServiceUnavailableError
+from app.services.resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, ResilientCaller, TokenBucket
+
+def make_caller(breaker: CircuitBreaker) -> ResilientCaller:
+    return ResilientCaller(
+        TokenBucket(0, 1),
+        AdaptiveConcurrencyLimiter(4, 1, 8, latency_target=60),
+        breaker,
+        max_retries=0,
+    )
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(AIServiceUnavailableError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 30
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+def test_breaker_half_open_allows_one_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(AIServiceUnavailableError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+def test_breaker_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(AIServiceUnavailableError):
+        breaker.before_call()
+
+def test_cancelled_probe_does_not_wedge_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    caller = make_caller(breaker)
+    breaker.record_failure()
+    clock.now += 31
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(caller.call(lambda: asyncio.sleep(10)), timeout=0.01)
+
+    asyncio.run(scenario())
+    # The abandoned probe counts as a failure, so the breaker waits a full reset again
+    assert breaker.state == "open"
+    assert not breaker._probe_in_flight
+    clock.now += 31
+    assert asyncio.run(caller.call(lambda: asyncio.sleep(0, "ok"))) == "ok"
+    assert breaker.state == "closed"
+
+def test_probe_cancelled_before_the_call_is_released(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    limiter = AdaptiveConcurrencyLimiter(1, 1, 1, latency_target=60)
+    caller = ResilientCaller(TokenBucket(0, 1), limiter, breaker, max_retries=0)
+    breaker.record_failure()
+    clock.now += 31
+
+    async def scenario():
+        # The only slot is taken, so the probe is cancelled while queued for it
+        async with limiter:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(caller.call(lambda: asyncio.sleep(0)), timeout=0.01)
+        assert breaker.state == "half_open"
+        return await caller.call(lambda: asyncio.sleep(0, "ok"))
+
+    assert asyncio.run(scenario()) == "ok"
+    assert breaker.state == "closed"
+
+def test_limiter_grows_additively(clock):
+    limiter = AdaptiveConcurrencyLimiter(4, 1, 6, latency_target=10)
+    for _ in range(4):
+        limiter.on_success(1)
+    assert limiter.limit == pytest.approx(5, abs=0.1)
+    for _ in range(100):
+        limiter.on_success(1)
+    assert limiter.limit == 6
+
+def test_limiter_backs_off_once_per_interval(clock):
+    limiter = AdaptiveConcurrencyLimiter(16, 2, 32, latency_target=10, backoff=0.5, decrease_interval=1.0)
+    limiter.on_overload()
+    limiter.on_overload()
+    assert limiter.limit == 8
+    clock.now += 1
+    limiter.on_success(11)
+    assert limiter.limit == 4
+    for _ in range(5):
+        clock.now += 1
+        limiter.on_overload()
+    assert limiter.limit == 2
+
+def test_limiter_bounds_in_flight_calls():
+    limiter = AdaptiveConcurrencyLimiter(2, 1, 2, latency_target=10)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(scenario())
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+def test_hold_keeps_the_slot_until_the_block_exits(clock):
+    limiter = AdaptiveConcurrencyLimiter(4, 1, 8, latency_target=10)
+    caller = ResilientCaller(TokenBucket(0, 1), limiter, CircuitBreaker(3, 30), max_retries=0)
+
+    async def scenario():
+        async with caller.hold(lambda: asyncio.sleep(0, "stream")) as stream:
+            assert stream == "stream"
+            assert limiter.in_flight == 1
+            # The streamed body takes longer than the latency target
+            clock.now += 11
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+    assert limiter.limit == 2
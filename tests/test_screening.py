@@ -0,0 +1,73 @@
+import pytest
+from app.models.models import StartupIdea
+from app.services.screening import clarification_for, screen_submission
+
+BACKGROUND = "Ten years of experience in the field"
+
+def idea(idea: str, customer: str, problem: str, solution: str) -> StartupIdea:
+    return StartupIdea(idea=idea, customer=customer, problem=problem, solution=solution, background=BACKGROUND)
+
+@pytest.mark.parametrize("submission", [
+    idea(
+        "Telemedicina para zonas rurales",
+        "Familias que viven lejos de los hospitales",
+        "No pueden pagar el transporte a la ciudad",
+        "Consultas por video con médicos certificados",
+    ),
+    idea(
+        "Kisaan ke liye mandi bhav app",
+        "Chhote kisaan jo gaon mein rehte hain",
+        "Bichauliye sahi daam nahi dete aur kharcha badhta hai",
+        "App jo roz ka mandi bhav aur seedha kharidar dikhaye",
+    ),
+    idea(
+        "Eine Plattform für Handwerksbetriebe",
+        "Meister mit kleinen Betrieben und wenig Personal",
+        "Angebotserstellung und Rechnungsstellung kosten viel Zeit",
+        "Automatisierte Angebote direkt vom Smartphone aus",
+    ),
+    idea(
+        "किसानों के लिए मंडी भाव ऐप",
+        "गाँव में रहने वाले छोटे किसान",
+        "बिचौलिये सही दाम नहीं देते हैं",
+        "रोज़ का मंडी भाव और सीधे खरीदार दिखाने वाला ऐप",
+    ),
+    idea("Meal kits!", "Busy nurses", "No time to cook", "Weekly boxes"),
+    idea(
+        "An AI tutor that helps school children practice maths at home",
+        "Parents of students in grades five to ten",
+        "Private tutoring is expensive and hard to find in small towns",
+        "Adaptive practice problems with step-by-step hints in the local language",
+    ),
+])
+def test_real_submissions_pass(submission):
+    assert screen_submission(submission) is None
+
+def test_keyboard_mashing_is_gibberish():
+    result = screen_submission(idea("sdfg hjkl wert dfgh", "zxcvbn mnbv qwrt", "xjqv bnmt plkj hgfd", "wqzx vbnc lkjh dfgs"))
+    assert "gibberish" in result.reasons
+
+def test_placeholders_are_flagged_per_field():
+    result = screen_submission(idea(
+        "test test test",
+        "Parents of students in grades five to ten",
+        "Private tutoring is expensive in small towns",
+        "lorem ipsum dolor",
+    ))
+    assert result.reasons == ["placeholder"]
+    assert result.fields == ["idea", "solution"]
+
+def test_repeated_characters_are_low_entropy():
+    result = screen_submission(idea(
+        "aaaaaaaaaaaa",
+        "Parents of students in grades five to ten",
+        "Private tutoring is expensive in small towns",
+        "Adaptive practice problems with hints",
+    ))
+    assert "low_entropy" in result.reasons
+
+def test_pasting_one_text_everywhere_is_flagged():
+    text = "A marketplace connecting farmers with restaurants in the city"
+    result = screen_submission(idea(text, text, text, text))
+    assert "duplicate_fields" in result.reasons
+    assert clarification_for(result)["type"] == "clarification_request"
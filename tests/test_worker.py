@@ -0,0 +1,70 @@
+import asyncio
+import sqlite3
+import pytest
+from app import worker as worker_module
+from app.services.jobqueue import SQLiteJobQueue
+from app.worker import AnalysisWorker
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteJobQueue(tmp_path / "jobs.db", visibility_timeout=0.3)
+    yield queue
+    queue.close()
+
+@pytest.fixture
+def saved(monkeypatch):
+    reports = {}
+
+    async def save_report(report_id, report_data):
+        reports[report_id] = report_data
+
+    monkeypatch.setattr(worker_module, "save_report", save_report)
+    return reports
+
+def job_rows(queue: SQLiteJobQueue):
+    with sqlite3.connect(queue.path) as conn:
+        return conn.execute("SELECT id, state, lease_owner FROM jobs").fetchall()
+
+def test_invalid_payload_fails_the_report(queue, saved):
+    queue.enqueue("bad", {"startup_data": {"idea": "too short"}, "queued_at": "2026-01-01T00:00:00"})
+    worker = AnalysisWorker(queue)
+    asyncio.run(worker._process(queue.lease(worker.owner)))
+    assert saved["bad"]["status"] == "failed"
+    assert saved["bad"]["queued_at"] == "2026-01-01T00:00:00"
+    assert job_rows(queue) == []
+
+def test_lost_lease_stops_the_analysis(queue, saved, monkeypatch):
+    payload = {
+        "startup_data": {
+            "idea": "An AI tutor for school maths",
+            "customer": "Parents of school children",
+            "problem": "Private tutoring is expensive",
+            "solution": "Adaptive practice with hints",
+            "background": "Former maths teacher",
+        },
+        "queued_at": "2026-01-01T00:00:00",
+    }
+    cancelled = asyncio.Event()
+
+    async def run_analysis(report_id, startup_data, queued_at):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(worker_module, "run_analysis", run_analysis)
+    queue.enqueue("job", payload)
+    worker = AnalysisWorker(queue)
+    job = queue.lease(worker.owner)
+    # Another worker reclaims the job, as after an expired lease
+    with sqlite3.connect(queue.path) as conn:
+        conn.execute("UPDATE jobs SET lease_owner = 'other' WHERE id = 'job'")
+
+    async def scenario():
+        await asyncio.wait_for(worker._process(job), timeout=2)
+
+    asyncio.run(scenario())
+    assert cancelled.is_set()
+    # The job is left to its new owner
+    assert job_rows(queue) == [("job", "leased", "other")]